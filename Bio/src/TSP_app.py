@@ -3,20 +3,28 @@ import numpy as np
 from PyQt5.QtGui import QCursor, QFont
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QComboBox, QLabel, QLineEdit, QFrame, QSizePolicy, QTextEdit, QCheckBox
+    QComboBox, QLabel, QLineEdit, QFrame, QSizePolicy, QTextEdit, QCheckBox, QFileDialog
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThreadPool
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from Bio.src.about import AboutPage
-from algorithms.ACO import ant_colony_optimization, cost_matrix_to_coords
+from algorithms.ACO import ant_colony_optimization, multi_colony_aco, cost_matrix_to_coords, resolve_candidate_k
 from algorithms.PSO import run_tsp_pso
 from algorithms.GBC import dabc_fns
-from plotting.utils import plot_tsp_solution, apply_mandatory_bridge,create_cost_matrix
-from algorithms.GA import run_tsp_ga
+from plotting.utils import plot_tsp_solution, EdgeConstraintSet, create_cost_matrix, DistanceOracle
+from plotting.live import LiveTourPlot, LiveCostChart
+from algorithms.GA import run_tsp_ga, run_tsp_ga_islands
+from algorithms.termination import TerminationPolicy
+from algorithms.race import run_race
+from instance import TSPInstance, DENSE_MATRIX_LIMIT, load_instance
+from workers import SolverWorker, RaceWorker
 from clicks import ClickableLabel
 from descriptions import descriptions
 
+# Upper bound on live tour redraws per second while a solver runs
+LIVE_PLOT_FPS = 20
+
 
 
 class TSPApp(QWidget):
@@ -57,8 +65,9 @@ class TSPApp(QWidget):
         # Algorithm Selector
         self.algorithm_selector = QComboBox()
         self.algorithm_selector.addItems([
-            "Ant Colony Optimization (ACO)", "Particle Swarm Optimization (PSO)",
-            "DABC_FNS(GBC)", "Genetic Algorithm (GA)"
+            "Ant Colony Optimization (ACO)", "MAX-MIN Ant System (ACO-MMAS)", "Ant Colony System (ACO-ACS)",
+            "Particle Swarm Optimization (PSO)",
+            "DABC_FNS(GBC)", "Genetic Algorithm (GA)", "Race - all algorithms"
         ])
         self.algorithm_selector.currentIndexChanged.connect(self.update_ui)
         self.sidebar.addWidget(QLabel("Select Algorithm:"))
@@ -84,11 +93,42 @@ class TSPApp(QWidget):
         self.node_input = QLineEdit("10")
         self.sidebar.addWidget(self.node_input)
 
+        # TSPLIB / CSV instance instead of random cities
+        self.load_button = QPushButton("Load instance…")
+        self.load_button.clicked.connect(self.load_instance_file)
+        self.sidebar.addWidget(self.load_button)
+        self.random_button = QPushButton("Use random cities")
+        self.random_button.clicked.connect(self.clear_loaded_instance)
+        self.random_button.hide()
+        self.sidebar.addWidget(self.random_button)
+        self.loaded_instance = None
+
         self.iter_label = ClickableLabel("Max Iterations:", self.show_description)
         self.sidebar.addWidget(self.iter_label)
         self.iter_input = QLineEdit("50")
         self.sidebar.addWidget(self.iter_input)
 
+        # Early termination, shared by every algorithm (blank = no limit)
+        self.time_limit_label = ClickableLabel("Time Limit (s):", self.show_description)
+        self.sidebar.addWidget(self.time_limit_label)
+        self.time_limit_input = QLineEdit("")
+        self.sidebar.addWidget(self.time_limit_input)
+
+        self.target_cost_label = ClickableLabel("Target Cost:", self.show_description)
+        self.sidebar.addWidget(self.target_cost_label)
+        self.target_cost_input = QLineEdit("")
+        self.sidebar.addWidget(self.target_cost_input)
+
+        self.stall_label = ClickableLabel("Stall Iterations:", self.show_description)
+        self.sidebar.addWidget(self.stall_label)
+        self.stall_input = QLineEdit("")
+        self.sidebar.addWidget(self.stall_input)
+
+        self.min_improvement_label = ClickableLabel("Min Improvement (%):", self.show_description)
+        self.sidebar.addWidget(self.min_improvement_label)
+        self.min_improvement_input = QLineEdit("")
+        self.sidebar.addWidget(self.min_improvement_input)
+
         # ACO-Specific Inputs
         self.alpha_label = ClickableLabel("Alpha (ACO):", self.show_description)
         self.sidebar.addWidget(self.alpha_label)
@@ -120,6 +160,26 @@ class TSPApp(QWidget):
         self.deposit_input = QLineEdit("100.0")
         self.sidebar.addWidget(self.deposit_input)
 
+        self.candidate_label = ClickableLabel("Candidate List Size (ACO):", self.show_description)
+        self.sidebar.addWidget(self.candidate_label)
+        self.candidate_input = QLineEdit("0")
+        self.sidebar.addWidget(self.candidate_input)
+
+        self.colonies_label = ClickableLabel("Colonies (ACO):", self.show_description)
+        self.sidebar.addWidget(self.colonies_label)
+        self.colonies_input = QLineEdit("1")
+        self.sidebar.addWidget(self.colonies_input)
+
+        self.stagnation_label = ClickableLabel("Stagnation Limit (ACO):", self.show_description)
+        self.sidebar.addWidget(self.stagnation_label)
+        self.stagnation_input = QLineEdit("30")
+        self.sidebar.addWidget(self.stagnation_input)
+
+        self.q0_label = ClickableLabel("Exploitation q0 (ACS):", self.show_description)
+        self.sidebar.addWidget(self.q0_label)
+        self.q0_input = QLineEdit("0.9")
+        self.sidebar.addWidget(self.q0_input)
+
         # PSO Specific Inputs
         self.pso_particles_label = ClickableLabel("Number of Particles (PSO):", self.show_description)
         self.sidebar.addWidget(self.pso_particles_label)
@@ -187,6 +247,28 @@ class TSPApp(QWidget):
             ["Order Crossover (OX1)", "Cycle Crossover (CX)", "Partially Mapped Crossover (PMX)"])
         self.sidebar.addWidget(self.ga_crossover_selector)
 
+        self.ga_local_search_label = QLabel("Local Search (GA):")
+        self.sidebar.addWidget(self.ga_local_search_label)
+        self.ga_local_search_selector = QComboBox()
+        self.ga_local_search_selector.addItems(["None", "2-opt", "2-opt + Or-opt"])
+        self.sidebar.addWidget(self.ga_local_search_selector)
+
+        self.ga_local_share_label = ClickableLabel("Local Search Share (GA):", self.show_description)
+        self.sidebar.addWidget(self.ga_local_share_label)
+        self.ga_local_share_input = QLineEdit("0.2")
+        self.sidebar.addWidget(self.ga_local_share_input)
+
+        self.ga_islands_label = ClickableLabel("Islands (GA):", self.show_description)
+        self.sidebar.addWidget(self.ga_islands_label)
+        self.ga_islands_input = QLineEdit("1")
+        self.sidebar.addWidget(self.ga_islands_input)
+
+        self.ga_migration_label = QLabel("Migration Topology (GA):")
+        self.sidebar.addWidget(self.ga_migration_label)
+        self.ga_migration_selector = QComboBox()
+        self.ga_migration_selector.addItems(["Ring", "Star", "Fully Connected"])
+        self.sidebar.addWidget(self.ga_migration_selector)
+
         # -- Bridge Controls --
         self.bridge_checkbox = QCheckBox("Enable Bridge Between Cities")
         self.sidebar.addWidget(self.bridge_checkbox)
@@ -194,11 +276,15 @@ class TSPApp(QWidget):
         self.bridge_city_a_input = QLineEdit("0")
         self.bridge_city_b_input = QLineEdit("1")
 
+        # Comma-separated lists give several bridges: A "0, 5" and B "1, 7" mean 0-1 and 5-7
         self.sidebar.addWidget(QLabel("Bridge: City A Index"))
         self.sidebar.addWidget(self.bridge_city_a_input)
 
         self.sidebar.addWidget(QLabel("Bridge: City B Index"))
         self.sidebar.addWidget(self.bridge_city_b_input)
+
+        self.bridge_hard_checkbox = QCheckBox("Hard Bridge (never broken)")
+        self.sidebar.addWidget(self.bridge_hard_checkbox)
         self.bridge_checkbox.stateChanged.connect(self.toggle_bridge_inputs)
 
         # Run Button
@@ -206,6 +292,16 @@ class TSPApp(QWidget):
         self.run_button.clicked.connect(self.run_algorithm)
         self.sidebar.addWidget(self.run_button)
 
+        # Stop Button: cancels the running solver at the end of its current iteration
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.stop_algorithm)
+        self.stop_button.setEnabled(False)
+        self.sidebar.addWidget(self.stop_button)
+
+        # Solvers run on the thread pool so the window stays responsive
+        self.thread_pool = QThreadPool.globalInstance()
+        self.worker = None
+
         # Set Sidebar Expandable
         for widget in self.sidebar.children():
             if isinstance(widget, (QLineEdit, QComboBox)):
@@ -269,17 +365,47 @@ class TSPApp(QWidget):
         is_checked = state == Qt.Checked
         self.bridge_city_a_input.setVisible(is_checked)
         self.bridge_city_b_input.setVisible(is_checked)
+        self.bridge_hard_checkbox.setVisible(is_checked)
+
+    def build_termination(self):
+        # TerminationPolicy from the early-stopping fields (blank = no limit). Every run gets
+        # one, since the Stop button cancels through it.
+        time_limit = self.time_limit_input.text().strip()
+        target_cost = self.target_cost_input.text().strip()
+        stall = self.stall_input.text().strip()
+        min_improvement = self.min_improvement_input.text().strip()
+        return TerminationPolicy(
+            max_seconds=float(time_limit) if time_limit else None,
+            target_cost=float(target_cost) if target_cost else None,
+            stall_iterations=int(stall) if stall else None,
+            min_improvement=float(min_improvement) / 100 if min_improvement else None,
+        )
+
+    def stop_note(self, termination):
+        # Suffix for the result label naming the criterion that ended the run
+        if termination.reason:
+            print(f"Stopped early: {termination.reason}")
+            return f" (stopped: {termination.reason})"
+        return ""
 
     def run_algorithm(self):
         try:
             algorithm = self.algorithm_selector.currentText()
-            num_nodes = int(self.node_input.text())
             max_iterations = int(self.iter_input.text())
 
-            # Step 1: Generate cities and create cost matrix
-            cities = np.random.rand(num_nodes, 2) * 100
-            cost_matrix = create_cost_matrix(cities)
-            np.fill_diagonal(cost_matrix, np.inf)
+            # Step 1: Generate cities and create cost matrix, unless an instance is loaded
+            if self.loaded_instance is not None:
+                cities = self.loaded_instance.cities
+                cost_matrix = self.loaded_instance.cost_matrix
+                num_nodes = len(cities)
+            else:
+                num_nodes = int(self.node_input.text())
+                cities = np.random.rand(num_nodes, 2) * 100
+                if num_nodes > DENSE_MATRIX_LIMIT:
+                    # Too large for an n x n matrix: compute distances on demand
+                    cost_matrix = DistanceOracle(cities)
+                else:
+                    cost_matrix = create_cost_matrix(cities)
 
             print(f"Running {algorithm} with {num_nodes} nodes and {max_iterations} iterations")
 
@@ -294,21 +420,27 @@ class TSPApp(QWidget):
                     if not city_a_text or not city_b_text:
                         raise ValueError("Bridge city fields are empty")
 
-                    city_a = int(city_a_text)
-                    city_b = int(city_b_text)
-
-                    if 0 <= city_a < num_nodes and 0 <= city_b < num_nodes and city_a != city_b:
-                        cost_matrix = apply_mandatory_bridge(cost_matrix, city_a, city_b)
-                        bridge = (city_a, city_b)  # ← Store the bridge tuple
-                        print(f"Applied bridge between City {city_a} and City {city_b}")
-                    else:
-                        print(
-                            f" Invalid city indices (must be between 0 and {num_nodes - 1} and not equal). Skipping bridge.")
+                    cities_a = [int(city) for city in city_a_text.split(",")]
+                    cities_b = [int(city) for city in city_b_text.split(",")]
+                    if len(cities_a) != len(cities_b):
+                        raise ValueError("Bridge city lists have different lengths")
+
+                    # Penalties need a dense matrix, so larger instances always use hard bridges
+                    hard = self.bridge_hard_checkbox.isChecked() or not isinstance(cost_matrix, np.ndarray)
+                    bridge = EdgeConstraintSet(zip(cities_a, cities_b), num_nodes, hard=hard)
+                    if not hard:
+                        if self.loaded_instance is not None:
+                            cost_matrix = np.array(cost_matrix)  # The cached matrix is read-only
+                        bridge.apply(cost_matrix)
+                    pairs = ", ".join(f"{a}-{b}" for a, b in bridge.edges)
+                    print(f"Applied {'hard' if hard else 'soft'} bridges between cities {pairs}")
                 except Exception as e:
                     print(f" Failed to apply bridge: {e}")
             else:
                 print(" Bridge not enabled.")
 
+            termination = self.build_termination()
+
             # Step 3: Set up canvas
             self.figure.clear()
             ax = self.figure.add_subplot(111)
@@ -317,11 +449,49 @@ class TSPApp(QWidget):
             self.current_cities = cities
             self.current_cost_matrix = cost_matrix
             self.current_ax = ax
+            self.live_plot = LiveTourPlot(ax, cities, bridge=bridge, max_fps=LIVE_PLOT_FPS)
+            self.race_plots = {}
+
+            # Neighbour lists are built once here and shared by the solvers. A bridge changes
+            # the metric, so the lists then come from the cost matrix instead of the grid.
+            if self.loaded_instance is not None and cost_matrix is self.loaded_instance.cost_matrix:
+                instance = self.loaded_instance  # Reuses the cached k-NN graph
+            else:
+                instance = TSPInstance(cities, cost_matrix,
+                                       metric="euclidean" if bridge is None or bridge.hard else "matrix")
 
         except Exception as e:
             print(f"Exception during run_algorithm: {e}")
 
-        if "ACO" in algorithm:
+        if "Race" in algorithm:
+            # ACO, PSO, GA and GBC side by side on this instance, each in its own process
+            solver_params = self.race_params(max_iterations, bridge)
+            self.live_plot.close()
+            self.figure.clear()
+            grid = self.figure.add_gridspec(3, 2, hspace=0.6)
+            # The four plots share the frame budget of a single run
+            race_fps = LIVE_PLOT_FPS / len(solver_params)
+            race_axes = {name: self.figure.add_subplot(grid[k // 2, k % 2]) for k, name in enumerate(solver_params)}
+            self.race_plots = {name: LiveTourPlot(race_ax, cities, bridge=bridge, max_fps=race_fps)
+                               for name, race_ax in race_axes.items()}
+            self.cost_chart = LiveCostChart(self.figure.add_subplot(grid[2, :]), list(solver_params))
+
+            def show_result(results):
+                for name, (snapshot, reason) in results.items():
+                    plot_tsp_solution(race_axes[name], cities, snapshot.best_tour,
+                                      f"{name} - Cost: {snapshot.best_cost:.2f}", bridge=bridge)
+                    self.cost_chart.add(name, snapshot.elapsed, snapshot.best_cost)
+                self.cost_chart.flush()
+                winner = min(results, key=lambda name: results[name][0].best_cost)
+                summary = ", ".join(f"{name} {snapshot.best_cost:.2f} in {snapshot.elapsed:.1f}s"
+                                    + (f" ({reason})" if reason else "")
+                                    for name, (snapshot, reason) in results.items())
+                self.result_label.setText(f"Race winner: {winner} - {summary}")
+
+            self.start_worker(show_result, termination, run_race, instance, solver_params,
+                              snapshot_interval=1.0 / race_fps, worker_class=RaceWorker)
+
+        elif "ACO" in algorithm:
             alpha = float(self.alpha_input.text())
             beta = float(self.beta_input.text())
             initial_pheromone = float(self.pheromone_input.text())
@@ -329,15 +499,47 @@ class TSPApp(QWidget):
             num_ants = int(self.ants_input.text())
             deposit_constant = float(self.deposit_input.text())
             max_iterations = int(self.iter_input.text())
-
-            best_solution, best_cost = ant_colony_optimization(
-                cost_matrix, alpha, beta, initial_pheromone, evaporation_rate,
-                num_ants, deposit_constant, max_iterations
-            )
-
-            nodes = np.random.rand(num_nodes, 2) * 100
-            plot_tsp_solution(self.current_ax, self.current_cities, best_solution, f"ACO (with bridge) - Cost: {best_cost:.2f}", bridge=bridge)
-            self.result_label.setText(f"ACO Best Cost: {best_cost:.2f}")
+            candidate_k = int(self.candidate_input.text() or 0)
+            if "MMAS" in algorithm:
+                variant = "MMAS"
+            elif "ACS" in algorithm:
+                variant = "ACS"
+            else:
+                variant = "AS"
+            # Plain ACO keeps its original behaviour unless asked to restart
+            stagnation_limit = int(self.stagnation_input.text() or 0) if variant != "AS" else None
+            q0 = float(self.q0_input.text())
+            colonies = int(self.colonies_input.text() or 1)
+            name = "ACO" if variant == "AS" else variant
+            # Candidate lists for the k the solver will use (20 for an oracle left at 0), from
+            # the instance's k-NN graph. A negative k is left for the solver to report.
+            neighbour_k = resolve_candidate_k(cost_matrix, candidate_k) if candidate_k >= 0 else None
+            neighbours = instance.neighbour_lists(neighbour_k) if neighbour_k else None
+
+            def show_result(result):
+                best_solution, best_cost = result
+                plot_tsp_solution(self.current_ax, self.current_cities, best_solution, f"{name} (with bridge) - Cost: {best_cost:.2f}", bridge=bridge)
+                self.result_label.setText(f"{name} Best Cost: {best_cost:.2f}" + self.stop_note(termination))
+
+            if colonies > 1:
+                self.start_worker(
+                    show_result, termination, multi_colony_aco,
+                    cost_matrix, alpha, beta, initial_pheromone, evaporation_rate,
+                    num_ants, deposit_constant, max_iterations, colonies=colonies, candidate_k=candidate_k,
+                    variant=variant, q0=q0, stagnation_limit=stagnation_limit,
+                    neighbours=neighbours,
+                    constraints=bridge
+                )
+            else:
+                self.start_worker(
+                    show_result, termination, ant_colony_optimization,
+                    cost_matrix, alpha, beta, initial_pheromone, evaporation_rate,
+                    num_ants, deposit_constant, max_iterations, candidate_k=candidate_k,
+                    variant=variant, q0=q0, stagnation_limit=stagnation_limit,
+                    neighbours=neighbours,
+                    nearest_unvisited=instance.nearest_unvisited,
+                    constraints=bridge
+                )
 
 
         elif "PSO" in algorithm:
@@ -347,7 +549,14 @@ class TSPApp(QWidget):
             c2 = float(self.pso_c2_input.text())
             v_max = float(self.pso_vmax_input.text())
             topology = self.topology_selector.currentText().lower()  # Get user-selected topology
-            cities, best_tour, best_distance = run_tsp_pso(
+
+            def show_result(result):
+                cities, best_tour, best_distance = result
+                plot_tsp_solution(ax, cities, best_tour, f"PSO ({topology.capitalize()}) - Distance: {best_distance:.2f}",bridge=bridge)
+                self.result_label.setText(f"PSO Best Distance: {best_distance:.2f}" + self.stop_note(termination))
+
+            self.start_worker(
+                show_result, termination, run_tsp_pso,
                 num_nodes=num_nodes,
                 num_particles=num_particles,
                 w=w,
@@ -356,71 +565,187 @@ class TSPApp(QWidget):
                 v_max=v_max,
                 max_iterations=max_iterations,
                 topology=topology,
-                bridge=(0,1) if self.bridge_checkbox.isChecked() else None
-
+                cities=cities,
+                cost_matrix=cost_matrix,
+                constraints=bridge,
             )
-            plot_tsp_solution(ax, cities, best_tour, f"PSO ({topology.capitalize()}) - Distance: {best_distance:.2f}",bridge=bridge)
-            self.result_label.setText(f"PSO Best Distance: {best_distance:.2f}")
 
 
         elif "DABC_FNS" in algorithm:
             sn = int(self.gbc_sn_input.text())  # Swarm size
             max_cycle = int(self.gbc_max_cycle_input.text())  # Maximum number of cycles
             trial_limit = int(self.gbc_trial_limit_input.text())  # Trial limit before replacement
-            # Generate a random cost matrix
-            cost_matrix = np.full((num_nodes, num_nodes), np.inf)  # Start with no connections
-
-            # Example default or user-defined connections:
-            # Format: (city1, city2, distance)
-            connections = [(0, 1, 50), (1, 2, 60), (2, 3, 40), (3, 0, 70)]
-
-            for a, b, d in connections:
-                cost_matrix[a][b] = d
-                cost_matrix[b][a] = d  # Assuming undirected graph
-
-            # Run the GBC Algorithm with user inputs
-            best_solution, best_cost = dabc_fns(cost_matrix, sn=sn, max_cycle=max_cycle, trial_limit=trial_limit)
 
-            # Generate random city positions
-            cities = np.random.rand(num_nodes, 2) * 100
+            def show_result(result):
+                best_solution, best_cost = result
+                # Plot the solution
+                plot_tsp_solution(ax, cities, best_solution, f"GBC Solution - Cost: {best_cost:.2f}", bridge=bridge)
+                self.result_label.setText(f"GBC Best Cost: {best_cost:.2f}" + self.stop_note(termination))
 
-            # Plot the solution
-            plot_tsp_solution(ax, cities, best_solution, f"GBC Solution - Cost: {best_cost:.2f}")
-            self.result_label.setText(f"GBC Best Cost: {best_cost:.2f}")
+            # Run the GBC Algorithm with user inputs on the shared instance
+            self.start_worker(show_result, termination, dabc_fns, cost_matrix, sn=sn, max_cycle=max_cycle,
+                              trial_limit=trial_limit, constraints=bridge)
 
         elif "GA" in algorithm:
             population_size = int(self.ga_population_input.text())
             generations = int(self.ga_generations_input.text())
             mutation_rate = float(self.ga_mutation_input.text())
             crossover_type = self.ga_crossover_selector.currentText()
-            cities, best_tour, best_distance,history = run_tsp_ga(
-                num_cities=num_nodes,
-                population_size=population_size,
-                generations=generations,
-                mutation_rate=mutation_rate,
-                crossover_type=crossover_type,
-
-
-            )
-            plot_tsp_solution(ax, cities, best_tour, f"GA Solution - Distance: {best_distance:.2f}")
-            self.ga_figure.clear()
-            ga_ax = self.ga_figure.add_subplot(111)
-            ga_ax.plot(history, label="Fitness over Generations", color='purple')
-            ga_ax.set_title("GA Convergence")
-            ga_ax.set_xlabel("Generation")
-            ga_ax.set_ylabel("Best Distance")
-            ga_ax.legend()
-            self.ga_canvas.draw()
-            self.result_label.setText(f"GA Best Distance: {best_distance:.2f}")
-        self.canvas.draw()
-        QApplication.processEvents()
+            islands = int(self.ga_islands_input.text() or 1)
+            local_search = self.ga_local_search_selector.currentText()
+            local_search = None if local_search == "None" else local_search
+            local_search_share = float(self.ga_local_share_input.text() or 0)
+
+            def show_result(result):
+                cities, best_tour, best_distance, history = result
+                plot_tsp_solution(ax, cities, best_tour, f"GA Solution - Distance: {best_distance:.2f}", bridge=bridge)
+                self.ga_figure.clear()
+                ga_ax = self.ga_figure.add_subplot(111)
+                ga_ax.plot(history, label="Fitness over Generations", color='purple')
+                ga_ax.set_title("GA Convergence")
+                ga_ax.set_xlabel("Generation")
+                ga_ax.set_ylabel("Best Distance")
+                ga_ax.legend()
+                self.ga_canvas.draw()
+                self.result_label.setText(f"GA Best Distance: {best_distance:.2f}" + self.stop_note(termination))
+
+            if islands > 1:
+                self.start_worker(
+                    show_result, termination, run_tsp_ga_islands,
+                    num_cities=num_nodes,
+                    population_size=population_size,
+                    generations=generations,
+                    mutation_rate=mutation_rate,
+                    crossover_type=crossover_type,
+                    islands=islands,
+                    topology=self.ga_migration_selector.currentText(),
+                    local_search=local_search,
+                    local_search_share=local_search_share,
+                    cities=cities,
+                    cost_matrix=cost_matrix,
+                    constraints=bridge,
+                )
+            else:
+                self.start_worker(
+                    show_result, termination, run_tsp_ga,
+                    num_cities=num_nodes,
+                    population_size=population_size,
+                    generations=generations,
+                    mutation_rate=mutation_rate,
+                    crossover_type=crossover_type,
+                    local_search=local_search,
+                    local_search_share=local_search_share,
+                    cities=cities,
+                    cost_matrix=cost_matrix,
+                    neighbours=instance.neighbour_lists() if local_search else None,
+                    constraints=bridge,
+                )
+
+    def start_worker(self, show_result, termination, solver, *args, worker_class=SolverWorker, **kwargs):
+        # Run the solver on the thread pool; show_result(result) runs back on the GUI thread
+        worker = worker_class(solver, *args, termination=termination, progress_interval=1.0 / LIVE_PLOT_FPS,
+                              **kwargs)
+
+        def finished(result):
+            self.close_live_plots()
+            show_result(result)
+            self.canvas.draw()
+            self.solver_stopped()
+
+        def failed(message):
+            self.close_live_plots()
+            print(f"Exception during run_algorithm: {message}")
+            self.result_label.setText("Run failed - see the console for details.")
+            self.solver_stopped()
+
+        worker.signals.progress.connect(self.show_progress)
+        worker.signals.snapshot.connect(self.show_race_progress)
+        worker.signals.finished.connect(finished)
+        worker.signals.error.connect(failed)
+        self.worker = worker
+        self.run_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.result_label.setText("Running...")
+        self.thread_pool.start(worker)
+
+    def show_progress(self, iteration, best_cost, best_tour):
+        self.result_label.setText(f"Iteration {iteration} - Best Cost: {best_cost:.2f}")
+        self.live_plot.set_data(best_tour, f"Iteration {iteration} - Best Cost: {best_cost:.2f}")
+
+    def show_race_progress(self, name, snapshot):
+        self.race_plots[name].set_data(snapshot.best_tour, f"{name} - Iteration {snapshot.iteration}")
+        self.cost_chart.add(name, snapshot.elapsed, snapshot.best_cost)
+        self.result_label.setText(f"{name}: iteration {snapshot.iteration} - Best Cost: {snapshot.best_cost:.2f}")
+
+    def close_live_plots(self):
+        self.live_plot.close()
+        for plot in self.race_plots.values():
+            plot.close()
+
+    def race_params(self, max_iterations, bridge):
+        # iter_solve parameters for every race entrant, read from each algorithm's own fields
+        return {
+            "ACO": dict(alpha=float(self.alpha_input.text()), beta=float(self.beta_input.text()),
+                        initial_pheromone=float(self.pheromone_input.text()),
+                        evap_rate=float(self.evap_input.text()), m=int(self.ants_input.text()),
+                        constant=float(self.deposit_input.text()), I_max=max_iterations,
+                        candidate_k=int(self.candidate_input.text() or 0), constraints=bridge),
+            "PSO": dict(num_particles=int(self.pso_particles_input.text()), w=float(self.pso_w_input.text()),
+                        c1=float(self.pso_c1_input.text()), c2=float(self.pso_c2_input.text()),
+                        v_max=float(self.pso_vmax_input.text()), max_iterations=max_iterations,
+                        topology=self.topology_selector.currentText().lower(), constraints=bridge),
+            "GA": dict(population_size=int(self.ga_population_input.text()),
+                       generations=int(self.ga_generations_input.text()),
+                       mutation_rate=float(self.ga_mutation_input.text()),
+                       crossover_type=self.ga_crossover_selector.currentText(),
+                       local_search=None if self.ga_local_search_selector.currentText() == "None"
+                       else self.ga_local_search_selector.currentText(),
+                       local_search_share=float(self.ga_local_share_input.text() or 0), constraints=bridge),
+            "GBC": dict(sn=int(self.gbc_sn_input.text()), max_cycle=int(self.gbc_max_cycle_input.text()),
+                        trial_limit=int(self.gbc_trial_limit_input.text()), constraints=bridge),
+        }
+
+    def load_instance_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Load TSP instance", "",
+                                              "TSP instances (*.tsp *.csv);;All files (*)")
+        if not path:
+            return
+        try:
+            self.loaded_instance = load_instance(path)
+        except Exception as e:
+            print(f"Failed to load instance: {e}")
+            self.result_label.setText(f"Could not load {path}: {e}")
+            return
+        num_nodes = len(self.loaded_instance)
+        self.node_input.setText(str(num_nodes))
+        self.node_input.setEnabled(False)
+        self.random_button.show()
+        self.result_label.setText(f"Loaded {self.loaded_instance.name} ({num_nodes} cities)")
+
+    def clear_loaded_instance(self):
+        self.loaded_instance = None
+        self.node_input.setEnabled(True)
+        self.random_button.hide()
+        self.result_label.setText("Using random cities.")
+
+    def stop_algorithm(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.result_label.setText("Stopping...")
+
+    def solver_stopped(self):
+        self.worker = None
+        self.run_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
 
     def update_ui(self):
         algorithm = self.algorithm_selector.currentText()
 
         aco_fields = [self.alpha_label, self.alpha_input, self.beta_label, self.beta_input,
                       self.pheromone_label, self.pheromone_input, self.evap_label, self.evap_input,
-                      self.ants_label, self.ants_input, self.deposit_label, self.deposit_input]
+                      self.ants_label, self.ants_input, self.deposit_label, self.deposit_input,
+                      self.candidate_label, self.candidate_input, self.colonies_label, self.colonies_input,
+                      self.stagnation_label, self.stagnation_input, self.q0_label, self.q0_input]
 
         pso_fields = [self.pso_particles_label, self.pso_particles_input, self.pso_w_label, self.pso_w_input,
                       self.pso_c1_label, self.pso_c1_input, self.pso_c2_label, self.pso_c2_input,
@@ -429,7 +754,9 @@ class TSPApp(QWidget):
         ga_fields = [self.ga_population_label, self.ga_population_input,
                      self.ga_generations_label, self.ga_generations_input,
                      self.ga_mutation_label, self.ga_mutation_input, self.ga_crossover_selector,
-                     self.ga_crossover_label]
+                     self.ga_crossover_label, self.ga_local_search_label, self.ga_local_search_selector,
+                     self.ga_local_share_label, self.ga_local_share_input, self.ga_islands_label, self.ga_islands_input,
+                     self.ga_migration_label, self.ga_migration_selector]
 
         gbc_fields = [self.gbc_sn_label, self.gbc_sn_input,
                       self.gbc_max_cycle_label, self.gbc_max_cycle_input,
@@ -437,9 +764,17 @@ class TSPApp(QWidget):
         # Common field to hide for GA and GBC
         max_iter_fields = [self.iter_label, self.iter_input]
 
-        bridge_fields = [self.bridge_checkbox,self.bridge_city_b_input,self.bridge_city_a_input]
+        bridge_fields = [self.bridge_checkbox,self.bridge_city_b_input,self.bridge_city_a_input,
+                         self.bridge_hard_checkbox]
 
-        if "ACO" in algorithm:
+        if "Race" in algorithm:
+            # Every entrant keeps its own parameters; islands and colonies do not apply
+            for field in aco_fields + pso_fields + ga_fields + gbc_fields + max_iter_fields + bridge_fields:
+                field.show()
+            for field in [self.ga_islands_label, self.ga_islands_input, self.ga_migration_label,
+                          self.ga_migration_selector, self.colonies_label, self.colonies_input]:
+                field.hide()
+        elif "ACO" in algorithm:
             for field in aco_fields:
                 field.show()
             for field in pso_fields + ga_fields + gbc_fields:
@@ -465,7 +800,7 @@ class TSPApp(QWidget):
             for field in max_iter_fields:
                 field.hide()
             for field in bridge_fields:
-                field.hide()
+                field.show()
         elif "DABC_FNS" in algorithm:
             for field in gbc_fields:
                 field.show()
@@ -474,7 +809,11 @@ class TSPApp(QWidget):
             for field in max_iter_fields:
                 field.hide()
             for field in bridge_fields:
-                field.hide()
+                field.show()
+        self.stagnation_label.setVisible("MMAS" in algorithm or "ACS" in algorithm)
+        self.stagnation_input.setVisible("MMAS" in algorithm or "ACS" in algorithm)
+        self.q0_label.setVisible("ACS" in algorithm)
+        self.q0_input.setVisible("ACS" in algorithm)
         self.ga_canvas.setVisible("GA" in algorithm)
 
     def show_about_page(self):
@@ -1,8 +1,15 @@
+import logging
+import multiprocessing
+import time
+
 import numpy as np
-import random
-from PyQt5.QtWidgets import QApplication
 
-from Bio.src.plotting.utils import plot_tsp_solution
+from Bio.src.algorithms.base import Snapshot, run_snapshots
+from Bio.src.algorithms.parallel import (share_array, shared_array_spec, attach_shared_array, share_cost_matrix,
+                                         attach_cost_matrix)
+from Bio.src.plotting.utils import tour_lengths, nearest_neighbour_lists
+
+logger = logging.getLogger(__name__)
 
 
 # Assuming you're using this utility
@@ -22,52 +29,220 @@ def cost_matrix_to_coords(cost_matrix):
 
 
 
-def ant_colony_optimization(
-    cost_matrix, alpha, beta, initial_pheromone, evap_rate, m, constant, I_max
-):
-    num_nodes = len(cost_matrix)
+def select_next(weights, totals, q0=0.0):
+    # Roulette wheel for every ant in one pass. With q0 > 0 (ACS pseudo-random proportional
+    # rule) each ant exploits the heaviest edge with probability q0 instead.
+    m = weights.shape[0]
+    cumulative = np.cumsum(weights, axis=1)
+    r = np.random.rand(m) * totals
+    picks = np.minimum((cumulative <= r[:, None]).sum(axis=1), weights.shape[1] - 1)
+    if q0 > 0:
+        greedy = np.random.rand(m) < q0
+        picks[greedy] = np.argmax(weights[greedy], axis=1)
+    return picks
 
-    # Initialize pheromone and heuristic matrices
-    pheromones = np.full((num_nodes, num_nodes), initial_pheromone)
-    heuristics = 1 / (cost_matrix + 1e-10)
 
-    best_solution = None
-    best_cost = float('inf')
+def construct_tours(choice, m, q0=0.0, local_update=None):
+    # Build m ant tours at once. choice[i][j] = pheromone**alpha * heuristic**beta
+    # local_update(current, next_nodes) is called after every step (ACS local pheromone update).
+    num_nodes = choice.shape[0]
+    ants = np.arange(m)
+    tours = np.empty((m, num_nodes), dtype=np.int64)
+    unvisited = np.ones((m, num_nodes), dtype=bool)
 
-    for iteration in range(I_max):
-        print(f"Starting iteration: {iteration + 1}")
-        solutions = []
-        costs = []
+    current = np.random.randint(0, num_nodes, size=m)
+    tours[:, 0] = current
+    unvisited[ants, current] = False
+
+    for step in range(1, num_nodes):
+        weights = choice[current] * unvisited
+        totals = weights.sum(axis=1)
+
+        # Fall back to a uniform choice over unvisited nodes when all weights vanish
+        stuck = totals < 1e-10
+        if stuck.any():
+            weights[stuck] = unvisited[stuck]
+            totals[stuck] = weights[stuck].sum(axis=1)
+
+        next_nodes = select_next(weights, totals, q0)
+
+        # Guard against landing on a visited node through float round-off
+        bad = ~unvisited[ants, next_nodes]
+        if bad.any():
+            next_nodes[bad] = np.argmax(unvisited[bad], axis=1)
+
+        tours[:, step] = next_nodes
+        unvisited[ants, next_nodes] = False
+        if local_update is not None:
+            local_update(current, next_nodes)
+        current = next_nodes
+
+    if local_update is not None:
+        local_update(current, tours[:, 0])  # closing edge
+
+    return tours
+
+
+def construct_tours_candidates(choice, candidates, cost_matrix, m, q0=0.0, local_update=None, nearest_unvisited=None):
+    # Build m ant tours choosing only among each city's k nearest neighbours.
+    # choice[i][s] is the weight of edge (i, candidates[i][s]). An ant whose candidates
+    # are all visited moves to its nearest unvisited city instead, found with
+    # nearest_unvisited(node, unvisited_mask) (e.g. TSPInstance.nearest_unvisited) or a row scan.
+    num_nodes, k = candidates.shape
+    ants = np.arange(m)
+    tours = np.empty((m, num_nodes), dtype=np.int64)
+    unvisited = np.ones((m, num_nodes), dtype=bool)
+
+    current = np.random.randint(0, num_nodes, size=m)
+    tours[:, 0] = current
+    unvisited[ants, current] = False
+
+    for step in range(1, num_nodes):
+        cand = candidates[current]
+        open_cand = unvisited[ants[:, None], cand]
+        weights = choice[current] * open_cand
+        totals = weights.sum(axis=1)
+
+        has_open = open_cand.any(axis=1)
+        stuck = has_open & (totals < 1e-10)
+        if stuck.any():
+            weights[stuck] = open_cand[stuck]
+            totals[stuck] = weights[stuck].sum(axis=1)
+
+        slots = select_next(weights, totals, q0)
+        next_nodes = cand[ants, slots].astype(np.int64)
+
+        # Nearest unvisited city for ants that exhausted their candidate list
+        closed = ~has_open
+        if closed.any():
+            if nearest_unvisited is not None:
+                for ant in np.nonzero(closed)[0]:
+                    next_nodes[ant] = nearest_unvisited(current[ant], unvisited[ant])
+            else:
+                rows = np.where(unvisited[closed], cost_matrix[current[closed]], np.inf)
+                next_nodes[closed] = np.argmin(rows, axis=1)
+
+        bad = ~unvisited[ants, next_nodes]
+        if bad.any():
+            next_nodes[bad] = np.argmax(unvisited[bad], axis=1)
+
+        tours[:, step] = next_nodes
+        unvisited[ants, next_nodes] = False
+        if local_update is not None:
+            local_update(current, next_nodes)
+        current = next_nodes
+
+    if local_update is not None:
+        local_update(current, tours[:, 0])  # closing edge
+
+    return tours
+
+
+def edge_slots(candidates, src, dst):
+    # Column of edge (src, dst) in an (n, k) candidate matrix, -1 where the edge is not stored
+    match = candidates[src] == np.asarray(dst)[:, None]
+    return np.where(match.any(axis=1), np.argmax(match, axis=1), -1)
+
+
+def deposit_pheromone(pheromones, tour, amount, candidates=None, keep=1.0):
+    # pheromone = keep * pheromone + amount on every edge of the closed tour, in both directions.
+    # With candidate lists only edges that are stored in the (n, k) matrix receive pheromone.
+    a = np.asarray(tour)
+    b = np.roll(a, -1)
+    for src, dst in ((a, b), (b, a)):
+        if candidates is not None:
+            slots = edge_slots(candidates, src, dst)
+            stored = slots >= 0
+            src, dst = src[stored], slots[stored]
+        pheromones[src, dst] = keep * pheromones[src, dst] + amount
+
+
+def mmas_limits(best_cost, evap_rate, constant, num_nodes, avg_choices, p_best=0.05):
+    # tau_max is the stationary value of an edge reinforced by the best tour every iteration;
+    # tau_min follows Stutzle & Hoos so the best tour is rebuilt with probability p_best.
+    tau_max = constant / (evap_rate * best_cost)
+    root = p_best ** (1 / num_nodes)
+    tau_min = tau_max * (1 - root) / ((avg_choices - 1) * root) if avg_choices > 1 else tau_max
+    return tau_max, min(tau_min, tau_max)
+
+
+def check_candidate_k(candidate_k):
+    # 0 or None selects the dense n x n mode; a negative list length is a caller error
+    if candidate_k is not None and candidate_k < 0:
+        raise ValueError(f"candidate_k must be 0 (dense pheromone) or a positive list length, got {candidate_k}")
+    return candidate_k or None
+
+
+def resolve_candidate_k(cost_matrix, candidate_k):
+    # The candidate list length a run actually uses: condensed matrices and distance oracles
+    # are never expanded to n x n pheromone, so they fall back to 20 neighbours
+    candidate_k = check_candidate_k(candidate_k)
+    if not candidate_k and not isinstance(cost_matrix, np.ndarray):
+        return 20
+    return candidate_k
 
-        # Build solutions for each ant
-        for _ in range(m):
-            visited = [random.randint(0, num_nodes - 1)]
-            while len(visited) < num_nodes:
-                current_node = visited[-1]
-                probabilities = [
-                    (j, (pheromones[current_node][j] ** alpha) * (heuristics[current_node][j] ** beta))
-                    for j in range(num_nodes) if j not in visited
-                ]
 
-                total = sum(prob for _, prob in probabilities)
+def candidate_lists(cost_matrix, candidate_k, neighbours=None):
+    # k nearest neighbours per city, reusing precomputed lists when they are long enough
+    if neighbours is not None and neighbours.shape[1] >= min(candidate_k, len(cost_matrix) - 1):
+        return np.ascontiguousarray(neighbours[:, :candidate_k])
+    return nearest_neighbour_lists(cost_matrix, candidate_k)
 
-                # Check for zero sum and correct
-                if total < 1e-10:
-                    probabilities = [(node, 1 / len(probabilities)) for node, _ in probabilities]
-                else:
-                    probabilities = [(node, prob / total) for node, prob in probabilities]
 
-                # Debug clearly visible
-                nodes, probs = zip(*probabilities)
-                next_node = random.choices(nodes, probs)[0]
+def candidate_heuristics(cost_matrix, beta, candidates=None):
+    # heuristic**beta on every edge, or only on the candidate edges as float32 (n, k)
+    if candidates is None:
+        heuristics = 1 / (np.asarray(cost_matrix, dtype=float) + 1e-10)
+        return heuristics ** beta
+    candidate_costs = np.asarray(cost_matrix[np.arange(len(candidates))[:, None], candidates], dtype=float)
+    return ((1 / (candidate_costs + 1e-10)) ** beta).astype(np.float32)
 
-                visited.append(next_node)
 
-            visited.append(visited[0])  # Close the loop
-            cost = sum(cost_matrix[visited[i]][visited[i + 1]] for i in range(len(visited) - 1))
+def aco_iterations(
+    cost_matrix, pheromones, heuristics_beta, alpha, evap_rate, m, constant, iterations, candidates=None,
+    variant="AS", q0=0.9, local_evap=0.1, stagnation_limit=None, state=None, nearest_unvisited=None,
+    constraints=None
+):
+    # Runs ACO iterations on the given pheromone array in place and yields the search state
+    # after each one. Passing the state back in continues a colony where it stopped, which is
+    # how multi_colony_aco resumes its colonies between exchanges.
+    num_nodes = len(cost_matrix)
+    variant = variant.upper()
+    if state is None:
+        state = {"iteration": 0, "best_tour": None, "best_cost": float('inf'), "since_improvement": 0,
+                 "tau0": float(pheromones.flat[0]), "tau_max": float(pheromones.flat[0])}
+
+    avg_choices = pheromones.shape[1] / 2
+    choice = (pheromones ** alpha) * heuristics_beta
 
-            solutions.append(visited)
-            costs.append(cost)
+    local_update = None
+    if variant == "ACS":
+        def local_update(current, next_nodes):
+            # ACS local rule: tau = (1 - xi) * tau + xi * tau0 on the edges just crossed
+            for src, dst in ((current, next_nodes), (next_nodes, current)):
+                if candidates is not None:
+                    slots = edge_slots(candidates, src, dst)
+                    stored = slots >= 0
+                    src, dst = src[stored], slots[stored]
+                pheromones[src, dst] = (1 - local_evap) * pheromones[src, dst] + local_evap * state["tau0"]
+                choice[src, dst] = pheromones[src, dst] ** alpha * heuristics_beta[src, dst]
+
+    for _ in range(iterations):
+        iteration = state["iteration"]
+        print(f"Starting iteration: {iteration + 1}")
+
+        # Build solutions for all ants from one choice matrix per iteration
+        if variant != "ACS":
+            choice = (pheromones ** alpha) * heuristics_beta
+        exploit = q0 if variant == "ACS" else 0.0
+        if candidates is None:
+            solutions = construct_tours(choice, m, exploit, local_update)
+        else:
+            solutions = construct_tours_candidates(choice, candidates, cost_matrix, m, exploit, local_update,
+                                                   nearest_unvisited)
+        if constraints is not None and constraints.hard:
+            constraints.repair(solutions)  # hard bridges: put every mandatory edge back
+        costs = tour_lengths(solutions, cost_matrix)
 
         # Get best solution of current iteration
         min_cost_index = np.argmin(costs)
@@ -75,27 +250,232 @@ def ant_colony_optimization(
         iteration_best_cost = costs[min_cost_index]
 
         # Update global best
-        if iteration_best_cost < best_cost:
-            best_solution = iteration_best_solution
-            best_cost = iteration_best_cost
+        if iteration_best_cost < state["best_cost"]:
+            state["best_tour"] = iteration_best_solution
+            state["best_cost"] = iteration_best_cost
+            state["since_improvement"] = 0
+        else:
+            state["since_improvement"] += 1
+        best_tour, best_cost = state["best_tour"], state["best_cost"]
 
         #  Update Pheromones
-        # Evaporation
-        pheromones *= (1 - evap_rate)
-        pheromone_deposit = constant / iteration_best_cost
+        if variant == "MMAS":
+            tau_max, tau_min = mmas_limits(best_cost, evap_rate, constant, num_nodes, avg_choices)
+            state["tau_max"] = tau_max
+            if iteration == 0:
+                pheromones.fill(tau_max)
+            pheromones *= (1 - evap_rate)
+            # Alternate between the global-best and the iteration-best ant
+            if iteration % 2:
+                deposit_pheromone(pheromones, best_tour, constant / best_cost, candidates)
+            else:
+                deposit_pheromone(pheromones, iteration_best_solution, constant / iteration_best_cost, candidates)
+            np.clip(pheromones, tau_min, tau_max, out=pheromones)
+        elif variant == "ACS":
+            if iteration == 0:
+                # tau0 on the scale of the deposits, as 1 / (n * C_nn) in Dorigo & Gambardella
+                state["tau0"] = constant / (num_nodes * best_cost)
+                pheromones.fill(state["tau0"])
+            # Global rule only touches the global-best edges
+            deposit_pheromone(pheromones, best_tour, evap_rate * constant / best_cost, candidates, keep=1 - evap_rate)
+            choice = (pheromones ** alpha) * heuristics_beta
+        else:
+            # Evaporation
+            pheromones *= (1 - evap_rate)
+            pheromone_deposit = constant / iteration_best_cost
+
+            # Update pheromones on edges used by the best ant, including the closing edge
+            deposit_pheromone(pheromones, iteration_best_solution, pheromone_deposit, candidates)
+
+        # Stagnation restart; a single ant always "agrees with itself", so only the limit applies then
+        converged = m > 1 and np.ptp(costs) < 1e-9
+        if stagnation_limit and (state["since_improvement"] >= stagnation_limit or converged):
+            logger.info("Stagnation detected at iteration %d, reinitialising pheromone", iteration + 1)
+            pheromones.fill(state["tau_max"] if variant == "MMAS" else state["tau0"])
+            if variant == "ACS":
+                choice = (pheromones ** alpha) * heuristics_beta
+            state["since_improvement"] = 0
+
+        state["iteration"] = iteration + 1
+        yield state
+
+
+def iter_aco(
+    cost_matrix, alpha, beta, initial_pheromone, evap_rate, m, constant, I_max, candidate_k=None,
+    variant="AS", q0=0.9, local_evap=0.1, stagnation_limit=None, neighbours=None, nearest_unvisited=None,
+    constraints=None
+):
+    # Yields a Snapshot after every iteration; see ant_colony_optimization for the parameters.
+    started = time.perf_counter()
+    num_nodes = len(cost_matrix)
+    candidate_k = resolve_candidate_k(cost_matrix, candidate_k)
+
+    if candidate_k:
+        # Candidate-list mode: pheromone and heuristic live only on the k nearest-neighbour edges
+        candidates = candidate_lists(cost_matrix, candidate_k, neighbours)
+        pheromones = np.full(candidates.shape, initial_pheromone, dtype=np.float32)
+    else:
+        candidates = None
+        # Initialize pheromone and heuristic matrices
+        pheromones = np.full((num_nodes, num_nodes), initial_pheromone, dtype=float)
+    heuristics_beta = candidate_heuristics(cost_matrix, beta, candidates)
+
+    for state in aco_iterations(
+        cost_matrix, pheromones, heuristics_beta, alpha, evap_rate, m, constant, I_max, candidates,
+        variant, q0, local_evap, stagnation_limit, nearest_unvisited=nearest_unvisited, constraints=constraints
+    ):
+        yield Snapshot(state["iteration"], state["best_cost"], state["best_tour"],
+                       time.perf_counter() - started, state["iteration"] * m)
+
+
+def iter_solve(instance, params):
+    # Common solver protocol: stream Snapshots for a TSPInstance. params holds iter_aco's
+    # keyword arguments; candidate lists come from the instance's k-NN graph.
+    params = dict(params)
+    candidate_k = resolve_candidate_k(instance.cost_matrix, params.get("candidate_k"))
+    if candidate_k:
+        params["candidate_k"] = candidate_k
+        if params.get("neighbours") is None:
+            params["neighbours"] = instance.neighbour_lists(candidate_k)
+        if params.get("nearest_unvisited") is None:
+            params["nearest_unvisited"] = instance.nearest_unvisited
+    return iter_aco(instance.cost_matrix, **params)
+
+
+def ant_colony_optimization(
+    cost_matrix, alpha, beta, initial_pheromone, evap_rate, m, constant, I_max, candidate_k=None,
+    variant="AS", q0=0.9, local_evap=0.1, stagnation_limit=None, neighbours=None, nearest_unvisited=None,
+    constraints=None, termination=None, progress=None
+):
+    # variant: "AS" (iteration-best deposit), "MMAS" (MAX-MIN Ant System) or "ACS" (Ant Colony System).
+    # stagnation_limit: reinitialise pheromone after that many iterations without improvement,
+    # or as soon as every ant (with m > 1) builds a tour of the same cost.
+    # neighbours / nearest_unvisited: precomputed candidate lists and nearest-unvisited query,
+    # e.g. from a TSPInstance, used in candidate-list mode instead of scanning the cost matrix.
+    # constraints: EdgeConstraintSet; hard bridges are restored in every ant's tour.
+    # termination: TerminationPolicy checked after every iteration.
+    # progress: called as progress(iteration, best_cost, best_tour) after every iteration.
+    last = run_snapshots(iter_aco(
+        cost_matrix, alpha, beta, initial_pheromone, evap_rate, m, constant, I_max, candidate_k,
+        variant, q0, local_evap, stagnation_limit, neighbours, nearest_unvisited, constraints
+    ), termination, progress)
+
+    if last is None or last.best_tour is None:
+        return None, float('inf')
+    best_solution = np.append(last.best_tour, last.best_tour[0]).tolist()  # Close the loop
+    return best_solution, last.best_cost
+
+
+def _attach_colony_arrays(cost_spec, pheromone_spec, candidate_spec, heuristic_spec, stop):
+    # Pool initializer: map the shared arrays once per worker process
+    global _colony_arrays, _colony_stop
+    _colony_stop = stop
+    _colony_arrays = [attach_cost_matrix(cost_spec)] + [attach_shared_array(spec) if spec else (None, None)
+                                                        for spec in (pheromone_spec, candidate_spec, heuristic_spec)]
+
+
+def _run_colony_epoch(colony, iterations, state, seed, params):
+    # One exchange interval of one colony, run in a worker process against shared memory.
+    # Returns the colony state and its best cost after each iteration; stops early at the
+    # wall-clock deadline, if any, or when the parent sets the stop event (cancellation).
+    np.random.seed(seed)
+    (_, cost_matrix), (_, pheromones), (_, candidates), (_, heuristics_beta) = _colony_arrays
+    history = []
+    for state in aco_iterations(
+        cost_matrix, pheromones[colony], heuristics_beta, params["alpha"], params["evap_rate"], params["m"],
+        params["constant"], iterations, candidates, params["variant"], params["q0"], params["local_evap"],
+        params["stagnation_limit"], state, constraints=params["constraints"]
+    ):
+        history.append(state["best_cost"])
+        if _colony_stop.is_set() or (params["deadline"] is not None and time.time() >= params["deadline"]):
+            break
+    return state, history
+
+
+def multi_colony_aco(
+    cost_matrix, alpha, beta, initial_pheromone, evap_rate, m, constant, I_max, colonies=4,
+    exchange_interval=10, exchange="best", blend=0.5, candidate_k=None, variant="AS", q0=0.9,
+    local_evap=0.1, stagnation_limit=None, processes=None, neighbours=None, constraints=None, termination=None,
+    progress=None
+):
+    # Independent colonies in a process pool. The cost matrix, candidate lists, heuristics and
+    # every colony's pheromone live in shared memory, so workers only exchange small state dicts.
+    # A distance oracle shares only its coordinates and runs in candidate-list mode, so no
+    # process ever holds an n x n array.
+    # Every exchange_interval iterations the colonies either all reinforce the overall best
+    # tour (exchange="best") or pull their pheromone towards the colony mean (exchange="blend").
+    # termination is checked on the merged per-iteration best after every exchange interval;
+    # its time limit and cancel() are also enforced inside the workers, after every iteration.
+    # progress is called after every interval.
+    num_nodes = len(cost_matrix)
+    if termination is not None:
+        termination.start()
+    candidate_k = resolve_candidate_k(cost_matrix, candidate_k)
+    candidates = candidate_lists(cost_matrix, candidate_k, neighbours) if candidate_k else None
+    heuristics_beta = candidate_heuristics(cost_matrix, beta, candidates)
+    shape = candidates.shape if candidates is not None else (num_nodes, num_nodes)
+    dtype = np.float32 if candidates is not None else float
+
+    cost_shm, cost_spec = share_cost_matrix(cost_matrix)
+    shared = [(cost_shm, None),
+              share_array(np.full((colonies,) + shape, initial_pheromone, dtype=dtype)),
+              share_array(candidates) if candidates is not None else (None, None),
+              share_array(heuristics_beta)]
+    specs = [cost_spec] + [shared_array_spec(shm, array) if shm is not None else None for shm, array in shared[1:]]
+    stop = multiprocessing.Event()
+    pheromones = shared[1][1]
+
+    params = {"alpha": alpha, "evap_rate": evap_rate, "m": m, "constant": constant, "variant": variant,
+              "q0": q0, "local_evap": local_evap, "stagnation_limit": stagnation_limit, "constraints": constraints,
+              "deadline": termination.deadline() if termination is not None else None}
+    states = [None] * colonies
+    best_tour, best_cost = None, float('inf')
+
+    try:
+        with multiprocessing.Pool(processes or colonies, _attach_colony_arrays, specs + [stop]) as pool:
+            done = 0
+            while done < I_max:
+                iterations = min(exchange_interval, I_max - done)
+                seeds = np.random.randint(0, 2 ** 31 - 1, size=colonies)
+                pending = pool.starmap_async(_run_colony_epoch, [
+                    (c, iterations, states[c], int(seeds[c]), params) for c in range(colonies)
+                ])
+                while not pending.ready():
+                    if termination is not None and termination.cancelled:
+                        stop.set()
+                    pending.wait(0.05)
+                results = pending.get()
+                states = [state for state, _ in results]
+                done += iterations
+
+                for state in states:
+                    if state["best_cost"] < best_cost:
+                        best_tour, best_cost = state["best_tour"], state["best_cost"]
 
-        # Update pheromones on edges used by the best ant
-        for i in range(len(iteration_best_solution) - 1):
-            a = iteration_best_solution[i]
-            b = iteration_best_solution[i + 1]
-            pheromones[a][b] += pheromone_deposit
-            pheromones[b][a] += pheromone_deposit  # Symmetric
+                if progress is not None:
+                    progress(done, best_cost, best_tour)
 
-        # Loop closure explicitly (optional but recommended)
-        a = iteration_best_solution[-1]
-        b = iteration_best_solution[0]
-        pheromones[a][b] += pheromone_deposit
-        pheromones[b][a] += pheromone_deposit
+                if termination is not None:
+                    # Colonies cut short by the deadline report fewer iterations
+                    length = min(len(history) for _, history in results)
+                    merged = np.min([history[:length] for _, history in results], axis=0)
+                    if any(termination.should_stop(done - length + k, cost) for k, cost in enumerate(merged)):
+                        break
 
+                # Exchange between colonies
+                if done < I_max:
+                    if exchange == "blend":
+                        mean = pheromones.mean(axis=0)
+                        pheromones *= (1 - blend)
+                        pheromones += blend * mean
+                    else:
+                        for c in range(colonies):
+                            deposit_pheromone(pheromones[c], best_tour, constant / best_cost, candidates)
+    finally:
+        for shm, _ in shared:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
 
+    best_solution = np.append(best_tour, best_tour[0]).tolist()  # Close the loop
     return best_solution, best_cost
@@ -1,5 +1,13 @@
-import numpy as np
+import multiprocessing
 import random
+import time
+
+import numpy as np
+
+from Bio.src.algorithms.base import Snapshot, run_snapshots
+from Bio.src.algorithms.parallel import share_cost_matrix, attach_cost_matrix
+from Bio.src.algorithms.local_search import improve_tour
+from Bio.src.plotting.utils import create_cost_matrix, tour_lengths, nearest_neighbour_lists
 
 
 def calculate_distance(city1, city2):
@@ -13,81 +21,153 @@ def calculate_tour_distance(tour, cities):
 
 
 def ordered_crossover(parent1, parent2):
-    #Performs Ordered Crossover (OX) for TSP.
+    #Performs Ordered Crossover (OX) for TSP in O(n) with a city mask.
     size = len(parent1)
     start, end = sorted(random.sample(range(size), 2))
+    parent1, parent2 = np.asarray(parent1), np.asarray(parent2)
 
-    child = [-1] * size
+    child = np.empty(size, dtype=parent1.dtype)
     child[start:end] = parent1[start:end]
 
-    parent2_remaining = [city for city in parent2 if city not in child]
-    index = 0
-
-    for i in range(size):
-        if child[i] == -1:
-            child[i] = parent2_remaining[index]
-            index += 1
+    in_child = np.zeros(size, dtype=bool)
+    in_child[parent1[start:end]] = True
+    parent2_remaining = parent2[~in_child[parent2]]
 
-    return child
+    child[:start] = parent2_remaining[:start]
+    child[end:] = parent2_remaining[start:]
+    return child.tolist()
 
 
 def partially_mapped_crossover(parent1, parent2):
-    # PMX implementation for TSP.
+    # PMX implementation for TSP in O(n) with a position lookup for parent1.
     size = len(parent1)
     start, end = sorted(random.sample(range(size), 2))
+    parent1, parent2 = np.asarray(parent1), np.asarray(parent2)
 
-    child = [-1] * size
-    # Step 1: Copy the slice from parent1 to child
-    child[start:end] = parent1[start:end]
-
-    # Step 2: Create mapping from parent2 slice
-    for i in range(start, end):
-        if parent2[i] not in child:
-            val = parent2[i]
-            pos = i
-            while True:
-                val_in_parent1 = parent1[pos]
-                pos = parent2.index(val_in_parent1)
-                if child[pos] == -1:
-                    child[pos] = val
-                    break
+    position1 = np.empty(size, dtype=np.int64)
+    position1[parent1] = np.arange(size)
+    in_slice = np.zeros(size, dtype=bool)
+    in_slice[parent1[start:end]] = True
 
-    # Step 3: Fill in remaining positions from parent2
-    for i in range(size):
-        if child[i] == -1:
-            child[i] = parent2[i]
-
-    return child
+    # Outside the slice take parent2's city, following the slice mapping until it is free
+    child = parent2.copy()
+    child[start:end] = parent1[start:end]
+    outside = np.r_[0:start, end:size]
+    values = parent2[outside]
+    clash = in_slice[values]
+    while clash.any():
+        values[clash] = parent2[position1[values[clash]]]
+        clash = in_slice[values]
+    child[outside] = values
+    return child.tolist()
 
 
 def cycle_crossover(parent1, parent2):
-    #Cycle Crossover (CX) for TSP.
+    #Cycle Crossover (CX) for TSP in O(n): cycles alternate between parent1 and parent2.
     size = len(parent1)
-    child = [-1] * size
-    index = 0
-    visited = [False] * size
-
-    while not all(visited):
-        if visited[index]:
-            index = visited.index(False)
-
-        start = index
-        val = parent1[index]
-
-        # Start forming cycle
-        while True:
-            child[index] = parent1[index]
+    parent1, parent2 = np.asarray(parent1), np.asarray(parent2)
+    position1 = np.empty(size, dtype=np.int64)
+    position1[parent1] = np.arange(size)
+
+    child = np.empty(size, dtype=parent1.dtype)
+    visited = np.zeros(size, dtype=bool)
+    from_parent1 = True
+    for start in range(size):
+        if visited[start]:
+            continue
+        source = parent1 if from_parent1 else parent2
+        index = start
+        while not visited[index]:
             visited[index] = True
-            index = parent1.index(parent2[index])
-            if index == start:
-                break
-
-        # Fill the rest from parent2
-        for i in range(size):
-            if not visited[i]:
-                child[i] = parent2[i]
-
-    return child
+            child[index] = source[index]
+            index = position1[parent2[index]]
+        from_parent1 = not from_parent1
+    return child.tolist()
+
+
+def random_cut_points(num_pairs, size):
+    # Two distinct cut points per pair, returned as (start, end) with start < end
+    a = np.random.randint(0, size, num_pairs)
+    b = (a + np.random.randint(1, size, num_pairs)) % size
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def ordered_crossover_batch(parents1, parents2):
+    # OX for every row pair at once; fills the free positions left to right in parent2's order
+    num_pairs, size = parents1.shape
+    rows = np.arange(num_pairs)[:, None]
+    positions = np.arange(size)
+    start, end = random_cut_points(num_pairs, size)
+    in_segment = (positions >= start[:, None]) & (positions < end[:, None])
+
+    taken = np.zeros((num_pairs, size), dtype=bool)
+    taken[rows, parents1] = in_segment
+    keep = ~taken[rows, parents2]
+
+    # k-th kept city goes to the k-th free position: k before the segment, k + length after it
+    rank = np.cumsum(keep, axis=1) - 1
+    target = rank + np.where(rank >= start[:, None], (end - start)[:, None], 0)
+
+    children = np.where(in_segment, parents1, 0).astype(parents1.dtype)
+    r, c = np.nonzero(keep)
+    children[r, target[r, c]] = parents2[r, c]
+    return children
+
+
+def partially_mapped_crossover_batch(parents1, parents2):
+    # PMX for every row pair at once, resolving slice conflicts for all rows per pass
+    num_pairs, size = parents1.shape
+    rows = np.arange(num_pairs)[:, None]
+    positions = np.arange(size)
+    start, end = random_cut_points(num_pairs, size)
+    in_segment = (positions >= start[:, None]) & (positions < end[:, None])
+
+    position1 = np.empty_like(parents1)
+    position1[rows, parents1] = positions
+    in_slice = np.zeros((num_pairs, size), dtype=bool)
+    in_slice[rows, parents1] = in_segment
+
+    values = parents2.copy()
+    clash = ~in_segment & in_slice[rows, values]
+    while clash.any():
+        r, c = np.nonzero(clash)
+        values[r, c] = parents2[r, position1[r, values[r, c]]]
+        clash[r, c] = in_slice[r, values[r, c]]
+    return np.where(in_segment, parents1, values)
+
+
+def cycle_crossover_batch(parents1, parents2):
+    # CX for every row pair at once. Each position is labelled with the smallest index of its
+    # cycle by pointer doubling; cycles then alternate between the parents in order of that index.
+    num_pairs, size = parents1.shape
+    rows = np.arange(num_pairs)[:, None]
+    positions = np.broadcast_to(np.arange(size), (num_pairs, size))
+
+    position1 = np.empty_like(parents1)
+    position1[rows, parents1] = positions
+    pointer = np.take_along_axis(position1, parents2, axis=1)
+
+    label = positions.copy()
+    for _ in range(max(1, int(np.ceil(np.log2(size))))):
+        np.minimum(label, np.take_along_axis(label, pointer, axis=1), out=label)
+        pointer = np.take_along_axis(pointer, pointer, axis=1)
+
+    cycle_rank = np.cumsum(label == positions, axis=1) - 1
+    from_parent1 = np.take_along_axis(cycle_rank, label, axis=1) % 2 == 0
+    return np.where(from_parent1, parents1, parents2)
+
+
+CROSSOVER_BATCH = {
+    "Order Crossover (OX1)": ordered_crossover_batch,
+    "Cycle Crossover (CX)": cycle_crossover_batch,
+    "Partially Mapped Crossover (PMX)": partially_mapped_crossover_batch,
+}
+
+
+def crossover_batch(parents1, parents2, crossover_type):
+    # Default to OX1 if unknown type
+    operator = CROSSOVER_BATCH.get(crossover_type, ordered_crossover_batch)
+    return operator(parents1, parents2), operator(parents2, parents1)
 
 def swap_mutation(tour, mutation_rate):
     #Swap two cities in the tour with probability mutation_rate.
@@ -104,65 +184,298 @@ def tournament_selection(population, fitnesses, tournament_size=3):
     return population[best_index]
 
 
-def run_tsp_ga(num_cities, population_size, generations, mutation_rate, crossover_type="Random Selection"):
-    cities = np.random.rand(num_cities, 2) * 100
-    population = [np.random.permutation(num_cities).tolist() for _ in range(population_size)]
-    fitnesses = np.array([calculate_tour_distance(tour, cities) for tour in population])
-
-    best_tour = population[np.argmin(fitnesses)]
-    best_distance = min(fitnesses)
-
-    history = [best_distance]  # Start tracking best distance
+def tournament_selection_batch(fitnesses, num_parents, tournament_size=3):
+    # Indices of num_parents tournament winners, each tournament drawn without replacement.
+    # Floyd's sampling, one column at a time: O(num_parents * t^2) rather than a key per
+    # population member and parent.
+    population_size = len(fitnesses)
+    tournament_size = min(tournament_size, population_size)
+    entrants = np.empty((num_parents, tournament_size), dtype=np.int64)
+    for column, upper in enumerate(range(population_size - tournament_size, population_size)):
+        draw = np.random.randint(0, upper + 1, num_parents)
+        taken = (entrants[:, :column] == draw[:, None]).any(axis=1)
+        entrants[:, column] = np.where(taken, upper, draw)
+    winners = np.argmin(fitnesses[entrants], axis=1)
+    return entrants[np.arange(num_parents), winners]
+
+
+def swap_mutation_batch(population, mutation_rate):
+    # Swap two cities in each row with probability mutation_rate (in place)
+    rows = np.where(np.random.rand(len(population)) < mutation_rate)[0]
+    if len(rows):
+        size = population.shape[1]
+        i = np.random.randint(0, size, len(rows))
+        j = (i + np.random.randint(1, size, len(rows))) % size  # j != i
+        population[rows, i], population[rows, j] = population[rows, j], population[rows, i]
+    return population
+
+
+def random_population(population_size, num_cities):
+    return np.argsort(np.random.rand(population_size, num_cities), axis=1).astype(np.int32)
+
+
+def memetic_step(population, fitnesses, cost_matrix, neighbours, method, share):
+    # Improve the best `share` of the population with neighbour-list 2-opt / Or-opt (in place)
+    count = int(np.ceil(share * len(population)))
+    for index in np.argsort(fitnesses)[:count]:
+        tour, gain = improve_tour(population[index], cost_matrix, neighbours, method)
+        if gain > 0:
+            population[index] = tour
+            fitnesses[index] = tour_lengths(tour, cost_matrix)
+
+
+def evolve_generation(population, fitnesses, cost_matrix, mutation_rate, crossover_type,
+                      local_search=None, neighbours=None, local_search_share=0.2, constraints=None):
+    # One generation: tournament selection, batched crossover, swap mutation, optional
+    # memetic local search on the best children and elitism. Hard bridge constraints are
+    # repaired after mutation and again after local search.
+    population_size, num_cities = population.shape
+    num_pairs = (population_size + 1) // 2
+
+    parents = population[tournament_selection_batch(fitnesses, 2 * num_pairs)]
+    children1, children2 = crossover_batch(parents[0::2], parents[1::2], crossover_type)
+
+    new_population = np.empty((2 * num_pairs, num_cities), dtype=np.int32)
+    new_population[0::2], new_population[1::2] = children1, children2
+    new_population = new_population[:population_size]
+
+    # Mutation
+    swap_mutation_batch(new_population, mutation_rate)
+    hard = constraints is not None and constraints.hard
+    if hard:
+        constraints.repair(new_population)
+
+    # Evaluate new population
+    new_fitnesses = tour_lengths(new_population, cost_matrix)
+
+    if local_search:
+        memetic_step(new_population, new_fitnesses, cost_matrix, neighbours, local_search, local_search_share)
+        if hard:
+            repaired = constraints.repair(new_population)
+            new_fitnesses[repaired] = tour_lengths(new_population[repaired], cost_matrix)
+
+    # Elitism: the previous best replaces the worst child
+    best_index = np.argmin(fitnesses)
+    worst_index = np.argmax(new_fitnesses)
+    new_population[worst_index] = population[best_index]
+    new_fitnesses[worst_index] = fitnesses[best_index]
+
+    return new_population, new_fitnesses
+
+
+def prepare_instance(num_cities, cities=None, cost_matrix=None):
+    # Random cities unless the caller passes its own; the cost matrix is only built when missing
+    if cities is None:
+        cities = np.random.rand(num_cities, 2) * 100
+    if cost_matrix is None:
+        cost_matrix = create_cost_matrix(cities)
+    return np.asarray(cities), cost_matrix
+
+
+def iter_ga(cost_matrix, population_size, generations, mutation_rate, crossover_type="Random Selection",
+            local_search=None, local_search_share=0.2, neighbours_k=10, neighbours=None, constraints=None):
+    # Yields a Snapshot for the initial population and after every generation; see run_tsp_ga
+    # for the parameters.
+    started = time.perf_counter()
+    num_cities = len(cost_matrix)
+    if local_search:
+        if neighbours is None:
+            neighbours = nearest_neighbour_lists(cost_matrix, neighbours_k)
+        neighbours = np.asarray(neighbours)[:, :neighbours_k].tolist()
+
+    # Population is one (population_size, num_cities) array, scored in a single gather
+    population = random_population(population_size, num_cities)
+    if constraints is not None and constraints.hard:
+        constraints.repair(population)
+    fitnesses = tour_lengths(population, cost_matrix)
+    best_index = np.argmin(fitnesses)
+    yield Snapshot(0, fitnesses[best_index], population[best_index], time.perf_counter() - started,
+                   population_size)
 
     for gen in range(generations):
-        new_population = []
-
-        for _ in range(population_size // 2):
-            parent1 = tournament_selection(population, fitnesses)
-            parent2 = tournament_selection(population, fitnesses)
-
-            if crossover_type == "Order Crossover (OX1)":
-                child1, child2 = ordered_crossover(parent1, parent2), ordered_crossover(parent2, parent1)
-
-            elif crossover_type == "Cycle Crossover (CX)":
-                child1, child2 = cycle_crossover(parent1, parent2), cycle_crossover(parent2, parent1)
-
-            elif crossover_type == "Partially Mapped Crossover (PMX)":
-                child1, child2 = partially_mapped_crossover(parent1, parent2), partially_mapped_crossover(parent2, parent1)
-
-            else:
-                # Default to OX1 if unknown type
-                child1, child2 = ordered_crossover(parent1, parent2), ordered_crossover(parent2, parent1)
-
-            # Mutation
-            child1 = swap_mutation(child1, mutation_rate)
-            child2 = swap_mutation(child2, mutation_rate)
-
-            new_population.extend([child1, child2])
-
-        # Evaluate new population
-        new_fitnesses = np.array([calculate_tour_distance(tour, cities) for tour in new_population])
-
-        # Elitism
+        population, fitnesses = evolve_generation(population, fitnesses, cost_matrix, mutation_rate, crossover_type,
+                                                  local_search, neighbours, local_search_share, constraints)
+        # Elitism keeps the best so far in the population
         best_index = np.argmin(fitnesses)
-        best_tour = population[best_index]
-        best_distance = fitnesses[best_index]
-
-        worst_index = np.argmax(new_fitnesses)
-        new_population[worst_index] = best_tour
-        new_fitnesses[worst_index] = best_distance
-
-        # Update population
-        population = new_population
-        fitnesses = new_fitnesses
-
-        # Update best overall solution
-        current_best_distance = min(new_fitnesses)
-        if current_best_distance < best_distance:
-            best_tour = new_population[np.argmin(new_fitnesses)]
-            best_distance = current_best_distance
-
-        history.append(best_distance)  # Append to history
+        yield Snapshot(gen + 1, fitnesses[best_index], population[best_index], time.perf_counter() - started,
+                       population_size * (gen + 2))
+
+
+def iter_solve(instance, params):
+    # Common solver protocol: stream Snapshots for a TSPInstance. params holds iter_ga's
+    # keyword arguments; local search uses the instance's k-NN graph.
+    params = dict(params)
+    if params.get("local_search") and params.get("neighbours") is None:
+        params["neighbours"] = instance.neighbour_lists(params.get("neighbours_k", 10))
+    return iter_ga(instance.cost_matrix, **params)
+
+
+def run_tsp_ga(num_cities, population_size, generations, mutation_rate, crossover_type="Random Selection",
+               local_search=None, local_search_share=0.2, neighbours_k=10, cities=None, cost_matrix=None,
+               neighbours=None, constraints=None, termination=None, progress=None):
+    # local_search: None, "2-opt" or "2-opt + Or-opt" applied to the best local_search_share of
+    # every generation's children, searching only the neighbours_k nearest cities.
+    # cities / cost_matrix: solve a caller-supplied instance instead of random cities.
+    # neighbours: precomputed (n, k) candidate lists, e.g. TSPInstance.neighbour_lists().
+    # constraints: EdgeConstraintSet whose hard bridges every tour keeps.
+    # termination: TerminationPolicy checked after every generation.
+    # progress: called as progress(generation, best_distance, best_tour) after every generation.
+    cities, cost_matrix = prepare_instance(num_cities, cities, cost_matrix)
+    history = []  # Best distance of the initial population and of every generation
+
+    def record(generation, best_distance, best_tour):
+        history.append(best_distance)
+        if progress is not None and generation > 0:
+            progress(generation, best_distance, best_tour)
+
+    last = run_snapshots(iter_ga(cost_matrix, population_size, generations, mutation_rate, crossover_type,
+                                 local_search, local_search_share, neighbours_k, neighbours, constraints),
+                         termination, record)
+    return cities, last.best_tour.tolist(), last.best_cost, history
+
+
+def _island_worker(conn, cost_spec, stop, seed, population_size, mutation_rate, crossover_type, migrants,
+                   local_search=None, local_search_share=0.2, neighbours_k=10, constraints=None):
+    # One island in its own process. After reporting its initial best it repeatedly receives
+    # (generations, immigrants, deadline) and answers (per-generation best distances, elite
+    # tours). Only tour indices cross the pipe. The stop event (cancellation) and the deadline
+    # end an epoch early.
+    np.random.seed(seed)
+    shm, cost_matrix = attach_cost_matrix(cost_spec)
+    neighbours = nearest_neighbour_lists(cost_matrix, neighbours_k).tolist() if local_search else None
+    population = random_population(population_size, len(cost_matrix))
+    if constraints is not None and constraints.hard:
+        constraints.repair(population)
+    fitnesses = tour_lengths(population, cost_matrix)
+    try:
+        conn.send(([fitnesses.min()], population[np.argsort(fitnesses)[:migrants]]))
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            generations, immigrants, deadline = message
+
+            # Immigrants replace the worst individuals. A star hub can receive more than its
+            # population holds; then only the best immigrants are kept.
+            if len(immigrants):
+                immigrant_fitnesses = tour_lengths(immigrants, cost_matrix)
+                keep = np.argsort(immigrant_fitnesses)[:len(population)]
+                worst = np.argsort(fitnesses)[-len(keep):]
+                population[worst] = immigrants[keep]
+                fitnesses[worst] = immigrant_fitnesses[keep]
+
+            history = []
+            for gen in range(generations):
+                population, fitnesses = evolve_generation(population, fitnesses, cost_matrix, mutation_rate,
+                                                          crossover_type, local_search, neighbours, local_search_share,
+                                                          constraints)
+                history.append(fitnesses.min())
+                if stop.is_set() or (deadline is not None and time.time() >= deadline):
+                    break
 
-    return np.array(cities), best_tour, best_distance, history
+            conn.send((history, population[np.argsort(fitnesses)[:migrants]]))
+    finally:
+        shm.close()
+        conn.close()
+
+
+def migration_sources(topology, islands):
+    # For every island, the islands whose elites it receives; a single island has none
+    topology = topology.lower()
+    if islands == 1:
+        return [[]]
+    if topology == "star":
+        # Island 0 is the hub: it hears every spoke, spokes hear only the hub
+        return [list(range(1, islands))] + [[0] for _ in range(1, islands)]
+    if topology in ("full", "fully connected"):
+        return [[j for j in range(islands) if j != i] for i in range(islands)]
+    return [[(i - 1) % islands] for i in range(islands)]  # ring
+
+
+def run_tsp_ga_islands(num_cities, population_size, generations, mutation_rate, crossover_type="Random Selection",
+                       islands=4, migration_interval=10, migrants=2, topology="ring", local_search=None,
+                       local_search_share=0.2, neighbours_k=10, cities=None, cost_matrix=None, constraints=None,
+                       termination=None, progress=None):
+    # Island model: each island evolves population_size tours in its own process and every
+    # migration_interval generations sends its best migrants along the ring, star or fully
+    # connected topology. history is the best distance over all islands per generation,
+    # shaped like run_tsp_ga's history (shorter if termination stops the run early; its time
+    # limit and cancel() are also enforced inside the islands, after every generation).
+    # progress is called after every migration.
+    if termination is not None:
+        termination.start()
+    cities, cost_matrix = prepare_instance(num_cities, cities, cost_matrix)
+    num_cities = len(cities)
+    shm, cost_spec = share_cost_matrix(cost_matrix)  # a distance oracle shares only its coordinates
+
+    sources = migration_sources(topology, islands)
+    seeds = np.random.randint(0, 2 ** 31 - 1, size=islands)
+    stop = multiprocessing.Event()
+    connections, workers = [], []
+
+    def receive(conn):
+        # Wait for an island's answer, passing a cancel on to the islands meanwhile
+        while not conn.poll(0.05):
+            if termination is not None and termination.cancelled:
+                stop.set()
+        return conn.recv()
+    try:
+        for i in range(islands):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_island_worker,
+                args=(child_conn, cost_spec, stop, int(seeds[i]), population_size, mutation_rate, crossover_type, migrants,
+                      local_search, local_search_share, neighbours_k, constraints),
+                daemon=True,
+            )
+            worker.start()
+            child_conn.close()
+            connections.append(parent_conn)
+            workers.append(worker)
+
+        history = []
+        best_tour, best_distance = None, float('inf')
+        first_epoch = True
+        deadline = termination.deadline() if termination is not None else None
+        for done in [0] + list(range(0, generations, migration_interval)):
+            if first_epoch:
+                results = [receive(conn) for conn in connections]  # initial populations
+                first_epoch = False
+            else:
+                epoch = min(migration_interval, generations - done)
+                for i, conn in enumerate(connections):
+                    immigrants = (np.concatenate([elites[j] for j in sources[i]]) if sources[i]
+                                  else np.empty((0, num_cities), dtype=np.int64))
+                    conn.send((epoch, immigrants, deadline))
+                results = [receive(conn) for conn in connections]
+
+            # Merge per-generation histories into one curve and collect the migrants. Islands
+            # cut short by the deadline report fewer generations.
+            length = min(len(island_history) for island_history, _ in results)
+            merged = np.min([island_history[:length] for island_history, _ in results], axis=0)
+            history.extend(merged)
+            elites = [island_elites for _, island_elites in results]
+            for island_elites in elites:
+                distance = tour_lengths(island_elites[0], cost_matrix)
+                if distance < best_distance:
+                    best_tour, best_distance = island_elites[0], distance
+
+            if progress is not None and len(history) > 1:
+                progress(len(history) - 1, best_distance, best_tour)
+            if termination is not None and len(history) > 1 and any(
+                termination.should_stop(len(history) - length + k, cost) for k, cost in enumerate(merged)
+            ):
+                break
 
+        for conn in connections:
+            conn.send(None)
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        shm.close()
+        shm.unlink()
+
+    return cities, best_tour.tolist(), best_distance, history
@@ -1,7 +1,9 @@
+import time
+
 import numpy as np
-from PyQt5.QtWidgets import QApplication
 
-from Bio.src.plotting.utils import plot_tsp_solution
+from Bio.src.algorithms.base import Snapshot, run_snapshots
+from Bio.src.plotting.utils import tour_lengths
 
 def calculate_fitness(route, cost_matrix):
     #Calculate the total cost (distance) of a given route.
@@ -20,6 +22,12 @@ def calculate_selection_probability(fitness_values):
     adjusted_fitness += 1e-10  # Avoid division by zero
     return adjusted_fitness / np.sum(adjusted_fitness)
 
+def enforce_constraints(solution, constraints):
+    #Restore hard bridge constraints (in place) so no operator leaves a tour without them.
+    if constraints is not None and constraints.hard:
+        constraints.repair(solution)
+    return solution
+
 def local_search(solution):
     #Performs a simple local search by swapping two adjacent cities.
     new_solution = solution.copy()
@@ -28,59 +36,131 @@ def local_search(solution):
     return new_solution
 
 
-def dabc_fns(cost_matrix, sn=10, max_cycle=5000, trial_limit=100,ax=None, canvas=None):
+def swap_delta(solutions, rows, i, j, cost_matrix):
+    #O(1) change in tour cost from swapping positions i and j of each row's tour.
+    #Only the (up to) four edges leaving positions i-1, i, j-1 and j change; when i and j are
+    #adjacent, or the tour is tiny, some of those are the same edge and are counted once.
+    n = solutions.shape[1]
+    tours = solutions[rows]
+    starts = np.stack([i - 1, i, j - 1, j], axis=1) % n
+    ends = (starts + 1) % n
+    first = np.ones(starts.shape, dtype=bool)
+    for col in range(1, 4):
+        first[:, col] = (starts[:, col:col + 1] != starts[:, :col]).all(axis=1)
+
+    def city_after_swap(positions):
+        positions = np.where(positions == i[:, None], j[:, None],
+                             np.where(positions == j[:, None], i[:, None], positions))
+        return np.take_along_axis(tours, positions, axis=1)
+
+    local = np.arange(len(rows))[:, None]
+    old = cost_matrix[tours[local, starts], tours[local, ends]]
+    new = cost_matrix[city_after_swap(starts), city_after_swap(ends)]
+    return np.where(first, new - old, 0).sum(axis=1)
+
+def swap_positions(solutions, rows, i, j):
+    #Swap positions i and j of the given rows in place.
+    solutions[rows, i], solutions[rows, j] = solutions[rows, j], solutions[rows, i]
+
+def try_moves(solutions, fitness_values, rows, cost_matrix, adjacent=None, constraints=None):
+    #Apply a random swap (followed by an adjacent swap where `adjacent` is True) to each row,
+    #keep the rows that got cheaper and undo the rest in place. Returns the improvement mask.
+    n = solutions.shape[1]
+    hard = constraints is not None and constraints.hard
+    if hard:
+        backup = solutions[rows].copy()
+    i = np.random.randint(0, n, len(rows))
+    j = (i + np.random.randint(1, n, len(rows))) % n
+    delta = swap_delta(solutions, rows, i, j, cost_matrix)
+    swap_positions(solutions, rows, i, j)
+
+    if adjacent is None:
+        adjacent = np.zeros(len(rows), dtype=bool)
+    adj_rows = rows[adjacent]
+    k = np.random.randint(0, n - 1, len(adj_rows))
+    delta[adjacent] += swap_delta(solutions, adj_rows, k, k + 1, cost_matrix)
+    swap_positions(solutions, adj_rows, k, k + 1)
+
+    new_fitness = fitness_values[rows] + delta
+    if hard:
+        #Repair moves the cities around, so repaired rows are rescored in full
+        moved = solutions[rows]
+        repaired = constraints.repair(moved)
+        solutions[rows] = moved
+        new_fitness[repaired] = tour_lengths(moved[repaired], cost_matrix)
+
+    better = new_fitness < fitness_values[rows]
+    fitness_values[rows[better]] = new_fitness[better]
+
+    #Undo rejected moves
+    if hard:
+        solutions[rows[~better]] = backup[~better]
+    else:
+        undo = ~better[adjacent]
+        swap_positions(solutions, adj_rows[undo], k[undo], k[undo] + 1)
+        swap_positions(solutions, rows[~better], i[~better], j[~better])
+    return better
+
+
+def iter_dabc(cost_matrix, sn=10, max_cycle=5000, trial_limit=100, constraints=None):
+    #Yields a Snapshot for the initial bees and after every cycle; see dabc_fns.
+    #All sn bees are one (sn, n) array: each phase proposes swap moves for every selected bee
+    #at once, scores them by their O(1) cost delta and undoes the rejected ones in place.
+    started = time.perf_counter()
     num_cities = cost_matrix.shape[0]
-    solutions = [np.random.permutation(num_cities) for _ in range(sn)]
-    fitness_values = np.array([calculate_fitness(sol, cost_matrix) for sol in solutions])
+    solutions = np.argsort(np.random.rand(sn, num_cities), axis=1)
+    enforce_constraints(solutions, constraints)
+    fitness_values = np.asarray(tour_lengths(solutions, cost_matrix), dtype=float)
     trials = np.zeros(sn, dtype=int)
+    bees = np.arange(sn)
+    evaluations = sn
 
     best_index = np.argmin(fitness_values)
-    best_solution, best_cost = solutions[best_index], fitness_values[best_index]
+    best_solution, best_cost = solutions[best_index].copy(), fitness_values[best_index]
+    yield Snapshot(0, best_cost, best_solution, time.perf_counter() - started, evaluations)
 
     for cycle in range(max_cycle):
-        for i in range(sn):
-            new_solution = mutate_solution(solutions[i])
-            new_fitness = calculate_fitness(new_solution, cost_matrix)
-
-            if new_fitness < fitness_values[i]:  # Accept better solution
-                solutions[i], fitness_values[i], trials[i] = new_solution, new_fitness, 0
-            else:
-                trials[i] += 1
+        #Every bee tries one swap
+        improved = try_moves(solutions, fitness_values, bees, cost_matrix, constraints=constraints)
+        trials = np.where(improved, 0, trials + 1)
 
         # Selection Probability Calculation
         probabilities = calculate_selection_probability(fitness_values)
 
-        # Employed Bees - Probabilistic Selection
-        for i in range(sn):
-            if np.random.rand() < probabilities[i]:
-                new_solution = mutate_solution(solutions[i])
-                new_fitness = calculate_fitness(new_solution, cost_matrix)
-
-                if np.random.rand() < 0.5:  # Apply local search with 50% chance
-                    new_solution = local_search(new_solution)
-                    new_fitness = calculate_fitness(new_solution, cost_matrix)
-
-                if new_fitness < fitness_values[i]:
-                    solutions[i], fitness_values[i], trials[i] = new_solution, new_fitness, 0
-                else:
-                    trials[i] += 1
+        # Employed Bees - Probabilistic Selection, half of them followed by an adjacent swap
+        chosen = bees[np.random.rand(sn) < probabilities]
+        if len(chosen):
+            adjacent = np.random.rand(len(chosen)) < 0.5
+            improved = try_moves(solutions, fitness_values, chosen, cost_matrix, adjacent, constraints)
+            trials[chosen] = np.where(improved, 0, trials[chosen] + 1)
 
         # Abandon and replace poor solutions
-        for i in range(sn):
-            if trials[i] > trial_limit:
-                solutions[i] = np.random.permutation(num_cities)
-                fitness_values[i] = calculate_fitness(solutions[i], cost_matrix)
-                trials[i] = 0
+        scouts = bees[trials > trial_limit]
+        if len(scouts):
+            solutions[scouts] = enforce_constraints(np.argsort(np.random.rand(len(scouts), num_cities), axis=1),
+                                                    constraints)
+            fitness_values[scouts] = tour_lengths(solutions[scouts], cost_matrix)
+            trials[scouts] = 0
+        evaluations += sn + len(chosen) + len(scouts)
 
         # Update global best
         best_index = np.argmin(fitness_values)
         if fitness_values[best_index] < best_cost:
-            best_solution, best_cost = solutions[best_index], fitness_values[best_index]
-        if ax and canvas:
-            cities = ...  # get or generate node coordinates if needed
-            plot_tsp_solution(ax, cities, best_solution, f"GBC Progress - Cycle {cycle + 1}")
-            canvas.draw()
-            QApplication.processEvents()
+            best_solution, best_cost = solutions[best_index].copy(), fitness_values[best_index]
+        yield Snapshot(cycle + 1, best_cost, best_solution, time.perf_counter() - started, evaluations)
+
+
+def iter_solve(instance, params):
+    #Common solver protocol: stream Snapshots for a TSPInstance. params holds iter_dabc's
+    #keyword arguments.
+    return iter_dabc(instance.cost_matrix, **params)
+
 
-    return best_solution, best_cost
+def dabc_fns(cost_matrix, sn=10, max_cycle=5000, trial_limit=100, constraints=None, termination=None,
+             progress=None):
+    #termination: TerminationPolicy checked after every cycle.
+    #progress: called as progress(cycle, best_cost, best_solution) after every cycle.
+    best = run_snapshots(iter_dabc(cost_matrix, sn, max_cycle, trial_limit, constraints), termination, progress)
 
+    #Deltas accumulate rounding error, so report the exact cost of the best tour
+    return best.best_tour, float(tour_lengths(best.best_tour, cost_matrix))
@@ -1,24 +1,24 @@
+import time
+
 import numpy as np
 import random
 
+from Bio.src.algorithms.base import Snapshot, run_snapshots
+from Bio.src.plotting.utils import create_cost_matrix, EdgeConstraintSet, tour_positions, tour_lengths
+
 
 def calculate_distance(city1, city2):
     #Calculate Euclidean distance between two cities.
     return np.linalg.norm(np.array(city1) - np.array(city2))
 
 
-def calculate_tour_distance(tour, cost_matrix, bridge=None):
-    total = sum(cost_matrix[tour[i]][tour[(i + 1) % len(tour)]] for i in range(len(tour)))
+def calculate_tour_distance(tours, cost_matrix, constraints=None, pos_index=None):
+    # Cost of one tour or a whole (num_particles, n) swarm in one gather
+    total = tour_lengths(tours, cost_matrix)
 
-    if bridge:
-        a, b = bridge
-        used = any(
-            (tour[i] == a and tour[(i + 1) % len(tour)] == b) or
-            (tour[i] == b and tour[(i + 1) % len(tour)] == a)
-            for i in range(len(tour))
-        )
-        if not used:
-            total += 1000  # Apply large penalty
+    # Penalty per bridge the tour leaves out
+    if constraints is not None:
+        total = total + constraints.penalties(np.asarray(tours), pos_index)
 
     return total
 
@@ -31,89 +31,156 @@ def swap_mutation(tour):
     return new_tour
 
 
-def get_local_best(swarm, fitnesses, index, neighborhood_size=2):
-    #Finds the best solution in a particle's local neighborhood.
-    num_particles = len(swarm)
-
-    # Define the ring neighborhood (circular list)
-    neighbors = [(index + i) % num_particles for i in range(-neighborhood_size, neighborhood_size + 1) if i != 0]
-
-    # Get the best neighbor's index
-    best_neighbor_idx = min(neighbors, key=lambda idx: fitnesses[idx])
-
-    return swarm[best_neighbor_idx]
+def ring_windows(num_particles, neighborhood_size=2):
+    # Ring neighbourhoods as one sliding window over the wrapped particle indices:
+    # row i holds the neighborhood_size particles on each side of particle i
+    wrapped = np.arange(-neighborhood_size, num_particles + neighborhood_size) % num_particles
+    windows = np.lib.stride_tricks.sliding_window_view(wrapped, 2 * neighborhood_size + 1)
+    return np.delete(windows, neighborhood_size, axis=1)
+
+
+def neighbourhood_best(pBest_costs, topology, windows=None, hub_index=0):
+    # Index of the pBest every particle follows. Star: the global best. Ring: the best of its
+    # window. Wheel: spokes only see the hub, the hub sees every particle.
+    if topology == "ring":
+        return windows[np.arange(len(windows)), np.argmin(pBest_costs[windows], axis=1)]
+    if topology == "wheel":
+        best = np.full(len(pBest_costs), hub_index)
+        best[hub_index] = np.argmin(pBest_costs)
+        return best
+    return np.full(len(pBest_costs), np.argmin(pBest_costs))
+
+
+def apply_swaps(positions, pos_index, rows, i, j):
+    # Swap positions i and j of the given particles, keeping the position index in sync
+    a, b = positions[rows, i], positions[rows, j]
+    positions[rows, i], positions[rows, j] = b, a
+    pos_index[rows, b], pos_index[rows, a] = i, j
+
+
+def pull_towards(positions, pos_index, targets, probability, velocity, lengths):
+    # Part of the basic swap sequence from each position to its target: every swap puts one
+    # mismatched city where the target has it, and each is taken with the given probability.
+    # The swaps are applied and appended to the velocity until it holds v_max swaps.
+    mismatches = (positions != targets).sum(axis=1)
+    wanted = np.random.binomial(mismatches, np.minimum(probability, 1.0))
+    wanted = np.minimum(wanted, velocity.shape[1] - lengths)
+    for step in range(wanted.max(initial=0)):
+        rows = np.nonzero(wanted > step)[0]
+        keys = np.random.rand(len(rows), positions.shape[1])
+        keys[positions[rows] == targets[rows]] = -1
+        i = keys.argmax(axis=1)
+        j = pos_index[rows, targets[rows, i]]
+        velocity[rows, lengths[rows]] = np.stack([i, j], axis=1)
+        apply_swaps(positions, pos_index, rows, i, j)
+        lengths[rows] += 1
+
+
+def update_velocities(positions, pos_index, velocity, lengths, pBest, neighbour_best, w, c1, c2):
+    # Discrete PSO step for the whole swarm. The velocity is a sequence of at most v_max swaps:
+    # each old swap survives with probability w (inertia), then swaps towards pBest
+    # (probability c1 * r1 each) and the neighbourhood best (c2 * r2) are added. Every swap is
+    # applied to the position as it joins the velocity.
+    num_particles, v_max = velocity.shape[:2]
+
+    # Inertia: keep a random share w of the old swaps, in order, and replay them
+    keep = (np.arange(v_max) < lengths[:, None]) & (np.random.rand(num_particles, v_max) < w)
+    order = np.argsort(~keep, axis=1, kind='stable')
+    velocity[:] = np.take_along_axis(velocity, order[:, :, None], axis=1)
+    lengths[:] = keep.sum(axis=1)
+    for step in range(lengths.max(initial=0)):
+        rows = np.nonzero(lengths > step)[0]
+        apply_swaps(positions, pos_index, rows, velocity[rows, step, 0], velocity[rows, step, 1])
+
+    pull_towards(positions, pos_index, pBest, c1 * np.random.rand(num_particles), velocity, lengths)
+    pull_towards(positions, pos_index, neighbour_best, c2 * np.random.rand(num_particles), velocity, lengths)
+
+    # A particle sitting on both attractors with no momentum left takes one random swap
+    rows = np.nonzero(lengths == 0)[0]
+    if len(rows):
+        num_nodes = positions.shape[1]
+        i = np.random.randint(0, num_nodes, len(rows))
+        j = (i + np.random.randint(1, num_nodes, len(rows))) % num_nodes
+        velocity[rows, 0] = np.stack([i, j], axis=1)
+        apply_swaps(positions, pos_index, rows, i, j)
+        lengths[rows] = 1
+
+
+def iter_pso(cost_matrix, num_particles, w, c1, c2, v_max, max_iterations, topology="star", constraints=None):
+    # Yields a Snapshot for the initial swarm and after every iteration; see run_tsp_pso for
+    # the parameters. A soft constraint set must already be applied to the cost matrix.
+    started = time.perf_counter()
+    num_nodes = len(cost_matrix)
+    hard = constraints is not None and constraints.hard
+
+    # Swarm, velocities and personal bests as arrays
+    swarm = np.argsort(np.random.rand(num_particles, num_nodes), axis=1)
+    if hard:
+        constraints.repair(swarm)
+    pos_index = tour_positions(swarm)
+    velocities = np.zeros((num_particles, max(1, int(v_max)), 2), dtype=np.int64)
+    lengths = np.zeros(num_particles, dtype=np.int64)
 
+    pBest = swarm.copy()
+    pBest_costs = calculate_tour_distance(swarm, cost_matrix, constraints, pos_index)
 
-def run_tsp_pso(num_nodes, num_particles, w, c1, c2, v_max, max_iterations, topology="star", bridge = None):
-    cities = np.random.rand(num_nodes, 2) * 100
-    cost_matrix = np.zeros((num_nodes, num_nodes))
-    for i in range(num_nodes):
-        for j in range(num_nodes):
-            if i == j:
-                cost_matrix[i][j] = np.inf
-            else:
-                cost_matrix[i][j] = np.linalg.norm(cities[i] - cities[j])
-
-    # Soft bridge constraint
-    if bridge:
-        a, b = bridge
-        cost_matrix[a][b] = cost_matrix[b][a] = 1e-5  # near-zero cost
-    swarm = [np.random.permutation(num_nodes).tolist() for _ in range(num_particles)]
-    velocities = [np.zeros(num_nodes) for _ in range(num_particles)]
-
-    for i in range(num_nodes):
-        for j in range(num_nodes):
-            if i != j and cost_matrix[i][j] == 0:
-                cost_matrix[i][j] = np.linalg.norm(cities[i] - cities[j])
+    topology = topology.lower()
+    windows = ring_windows(num_particles) if topology == "ring" else None
 
-    pBest = swarm.copy()
-    pBest_costs = np.array([calculate_tour_distance(t, cost_matrix,bridge=bridge) for t in swarm])
-
-    # For wheel, define hub as index 0
-    if topology.lower() == "wheel":
-        hub_index = 0
-        gBest = pBest[hub_index]
-        gBest_cost = pBest_costs[hub_index]
-    else:
-        gBest_index = np.argmin(pBest_costs)
-        gBest = pBest[gBest_index]
-        gBest_cost = pBest_costs[gBest_index]
+    # pBest is updated in place, so snapshots carry a copy of the best tour
+    best = np.argmin(pBest_costs)
+    best_cost, best_tour = pBest_costs[best], pBest[best].copy()
+    yield Snapshot(0, best_cost, best_tour, time.perf_counter() - started, num_particles)
 
     for iteration in range(max_iterations):
-        solution= []
-
-        for i in range(num_particles):
-            if topology.lower() == "wheel":
-                # All particles follow the hub
-                best_neighbor = gBest
-            elif topology.lower() == "star":
-                best_neighbor = gBest
-            elif topology.lower() == "ring":
-                best_neighbor = get_local_best(swarm, pBest_costs, i)
-            else:
-                best_neighbor = gBest  # fallback
-
-            inertia = w * velocities[i]
-            cognitive = c1 * np.random.rand() * np.array(pBest[i])
-            social = c2 * np.random.rand() * np.array(best_neighbor)
-            new_velocity = inertia + cognitive + social
-            new_velocity = np.clip(new_velocity, -v_max, v_max)
-
-            velocities[i] = new_velocity
-            new_tour = swap_mutation(swarm[i])  # still TSP-specific position update
-            new_cost = calculate_tour_distance(new_tour, cost_matrix,bridge=bridge)
-
-            if new_cost < pBest_costs[i]:
-                pBest[i] = new_tour
-                pBest_costs[i] = new_cost
-
-                if topology.lower() == "wheel" and i == hub_index:
-                    gBest = new_tour
-                    gBest_cost = new_cost
-                elif new_cost < gBest_cost:
-                    gBest = new_tour
-                    gBest_cost = new_cost
-
-            swarm[i] = new_tour
-
-    return np.array(cities), gBest, gBest_cost
+        neighbour_best = pBest[neighbourhood_best(pBest_costs, topology, windows)]
+
+        update_velocities(swarm, pos_index, velocities, lengths, pBest, neighbour_best, w, c1, c2)
+        if hard:
+            repaired = constraints.repair(swarm)
+            pos_index[repaired] = tour_positions(swarm[repaired])
+        costs = calculate_tour_distance(swarm, cost_matrix, constraints, pos_index)
+
+        improved = costs < pBest_costs
+        pBest[improved] = swarm[improved]
+        pBest_costs[improved] = costs[improved]
+
+        best = np.argmin(pBest_costs)
+        if pBest_costs[best] < best_cost:
+            best_cost, best_tour = pBest_costs[best], pBest[best].copy()
+        yield Snapshot(iteration + 1, best_cost, best_tour, time.perf_counter() - started,
+                       num_particles * (iteration + 2))
+
+
+def iter_solve(instance, params):
+    # Common solver protocol: stream Snapshots for a TSPInstance. params holds iter_pso's
+    # keyword arguments.
+    return iter_pso(instance.cost_matrix, **params)
+
+
+def run_tsp_pso(num_nodes, num_particles, w, c1, c2, v_max, max_iterations, topology="star", bridge = None,
+                cities=None, cost_matrix=None, constraints=None, termination=None, progress=None):
+    # Discrete PSO with swap-sequence velocities: w, c1, c2 set how much of the old velocity and
+    # of the pulls towards pBest / the neighbourhood best survive, v_max caps the swaps per move.
+    # cities / cost_matrix: solve a caller-supplied instance instead of random cities.
+    # A supplied cost matrix is used as-is (apply the bridges to it beforehand if wanted).
+    # constraints: EdgeConstraintSet of mandatory edges; bridge=(a, b) is shorthand for one.
+    # termination: TerminationPolicy checked after every iteration.
+    # progress: called as progress(iteration, best_cost, best_tour) after every iteration.
+    if cities is None:
+        cities = np.random.rand(num_nodes, 2) * 100
+    cities = np.asarray(cities)
+    num_nodes = len(cities)
+    if constraints is None and bridge:
+        constraints = EdgeConstraintSet([bridge], num_nodes)
+
+    if cost_matrix is None:
+        cost_matrix = create_cost_matrix(cities)
+
+        # Soft bridge constraint
+        if constraints is not None and not constraints.hard:
+            constraints.apply(cost_matrix)
+
+    last = run_snapshots(iter_pso(cost_matrix, num_particles, w, c1, c2, v_max, max_iterations, topology,
+                                  constraints), termination, progress)
+    return cities, last.best_tour.tolist(), last.best_cost
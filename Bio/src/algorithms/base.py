@@ -0,0 +1,33 @@
+from collections import namedtuple
+
+# What every solver's iter_solve(instance, params) yields after each iteration (generation,
+# cycle). Iteration 0, where present, describes the initial population. best_tour is never
+# modified by the solver afterwards, so consumers can keep it without copying.
+Snapshot = namedtuple("Snapshot", ["iteration", "best_cost", "best_tour", "elapsed", "evaluations"])
+
+# Solvers implementing the protocol: name -> module providing iter_solve(instance, params).
+# Modules are imported by name, so worker processes only load the solvers they run.
+SOLVER_MODULES = {
+    "ACO": "Bio.src.algorithms.ACO",
+    "PSO": "Bio.src.algorithms.PSO",
+    "GA": "Bio.src.algorithms.GA",
+    "GBC": "Bio.src.algorithms.GBC",
+}
+
+
+def run_snapshots(snapshots, termination=None, progress=None):
+    # Drive a snapshot stream to the end, or until the termination policy fires, reporting
+    # every snapshot to progress(iteration, best_cost, best_tour). Returns the last snapshot.
+    # Iteration 0 (the initial population) is reported but does not count towards termination.
+    if termination is not None:
+        termination.start()
+    last = None
+    try:
+        for last in snapshots:
+            if progress is not None:
+                progress(last.iteration, last.best_cost, last.best_tour)
+            if termination is not None and last.iteration > 0 and termination.should_stop(last.iteration, last.best_cost):
+                break
+    finally:
+        snapshots.close()
+    return last
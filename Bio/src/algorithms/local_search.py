@@ -0,0 +1,156 @@
+from collections import deque
+
+import numpy as np
+
+
+def _distance_function(cost_matrix):
+    # Fast scalar lookups: ndarray.item avoids creating a NumPy scalar per call
+    if isinstance(cost_matrix, np.ndarray):
+        return cost_matrix.item
+    return lambda a, b: float(cost_matrix[a, b])
+
+
+def _reverse(tour, pos, i, j):
+    # Reverse tour positions i..j (inclusive, going forwards around the cycle). The shorter of
+    # the segment and its complement is reversed, which gives the same cycle.
+    n = len(tour)
+    length = (j - i) % n + 1
+    if 2 * length > n:
+        i, j = (j + 1) % n, (i - 1) % n
+        length = n - length
+    for _ in range(length // 2):
+        a, b = tour[i], tour[j]
+        tour[i], tour[j] = b, a
+        pos[b], pos[a] = i, j
+        i = (i + 1) % n
+        j = (j - 1) % n
+
+
+def two_opt(tour, cost_matrix, neighbours, active=None):
+    # 2-opt restricted to k-nearest-neighbour candidate edges, driven by don't-look bits:
+    # only cities in the queue are examined and a city is re-queued when an edge at it changes.
+    # Returns the improved tour as a list and the total gain.
+    tour = list(tour)
+    n = len(tour)
+    if n < 4:
+        return tour, 0.0
+    dist = _distance_function(cost_matrix)
+    pos = [0] * n
+    for index, city in enumerate(tour):
+        pos[city] = index
+
+    queue = deque(range(n) if active is None else active)
+    queued = [False] * n
+    for city in queue:
+        queued[city] = True
+    gain = 0.0
+
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        improved = False
+
+        for forward in (True, False):
+            i = pos[a]
+            a_next = tour[(i + 1) % n] if forward else tour[(i - 1) % n]
+            d_a = dist(a, a_next)
+            for c in neighbours[a]:
+                d_ac = dist(a, c)
+                if d_ac >= d_a:
+                    break  # neighbours are sorted, no later candidate can help
+                j = pos[c]
+                c_next = tour[(j + 1) % n] if forward else tour[(j - 1) % n]
+                if c_next == a or c == a_next:
+                    continue
+                delta = d_ac + dist(a_next, c_next) - d_a - dist(c, c_next)
+                if delta < -1e-10:
+                    if forward:
+                        _reverse(tour, pos, (i + 1) % n, j)  # a c ... a_next c_next
+                    else:
+                        _reverse(tour, pos, j, (i - 1) % n)  # c_next a_next ... c a
+                    gain -= delta
+                    for city in (a, a_next, c, c_next):
+                        if not queued[city]:
+                            queue.append(city)
+                            queued[city] = True
+                    improved = True
+                    break
+            if improved:
+                break
+
+    return tour, gain
+
+
+def or_opt(tour, cost_matrix, neighbours, max_segment=3):
+    # Or-opt: move a segment of 1..max_segment cities, possibly reversed, between a candidate
+    # neighbour c of one of its end cities and a tour neighbour d of c. One pass over all
+    # segment starts; the candidate lists keep each evaluation at O(k).
+    tour = list(tour)
+    n = len(tour)
+    if n < 5:
+        return tour, 0.0
+    dist = _distance_function(cost_matrix)
+    pos = [0] * n
+    for index, city in enumerate(tour):
+        pos[city] = index
+    gain = 0.0
+
+    for start_city in range(n):
+        move = None
+        for length in range(1, max_segment + 1):
+            i = pos[start_city]
+            segment = [tour[(i + s) % n] for s in range(length)]
+            prev, nxt = tour[(i - 1) % n], tour[(i + length) % n]
+            removal = dist(prev, segment[0]) + dist(segment[-1], nxt) - dist(prev, nxt)
+            in_segment = set(segment)
+
+            for end, other in ((segment[0], segment[-1]), (segment[-1], segment[0])):
+                for c in neighbours[end]:
+                    if c in in_segment:
+                        continue
+                    if dist(end, c) >= removal:
+                        break
+                    for d in (tour[(pos[c] + 1) % n], tour[(pos[c] - 1) % n]):
+                        if d in in_segment or {c, d} == {prev, nxt}:
+                            continue
+                        # Insert with `end` next to c and `other` next to d
+                        delta = dist(c, end) + dist(other, d) - dist(c, d) - removal
+                        if delta < -1e-10:
+                            move = (i, length, segment, end, c, d, delta)
+                            break
+                    if move:
+                        break
+                if move:
+                    break
+            if move:
+                break
+
+        if move:
+            i, length, segment, end, c, d, delta = move
+            rest = [tour[(i + length + t) % n] for t in range(n - length)]
+            piece = segment if end == segment[0] else segment[::-1]  # runs from end to other
+            k = rest.index(c)
+            if k + 1 < len(rest) and rest[k + 1] == d:
+                tour = rest[:k + 1] + piece + rest[k + 1:]
+            else:
+                tour = rest[:k] + piece[::-1] + rest[k:]
+            for index, city in enumerate(tour):
+                pos[city] = index
+            gain -= delta
+
+    return tour, gain
+
+
+def improve_tour(tour, cost_matrix, neighbours, method="2-opt", max_rounds=10):
+    # 2-opt to a local optimum, then (for "2-opt + Or-opt") alternate with Or-opt passes
+    # while they keep finding improvements.
+    tour, gain = two_opt(tour, cost_matrix, neighbours)
+    if "or-opt" not in method.lower():
+        return np.array(tour), gain
+    for _ in range(max_rounds):
+        tour, or_gain = or_opt(tour, cost_matrix, neighbours)
+        if or_gain <= 0:
+            break
+        tour, two_opt_gain = two_opt(tour, cost_matrix, neighbours)
+        gain += or_gain + two_opt_gain
+    return np.array(tour), gain
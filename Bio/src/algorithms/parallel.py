@@ -0,0 +1,59 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Bio.src.plotting.utils import CondensedCostMatrix, DistanceOracle
+
+
+def share_array(array):
+    # Copy an array into a new shared memory block. Returns (shm, view); the creator must
+    # close() and unlink() the block when done.
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, view
+
+
+def shared_array_spec(shm, array):
+    # Small picklable description of a shared array, sent to workers instead of the data
+    return shm.name, array.shape, array.dtype.str
+
+
+def attach_shared_array(spec):
+    # Map a shared array created by share_array in another process
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def share_cost_matrix(cost_matrix):
+    # Share a cost matrix with worker processes without expanding it to n x n: a dense array is
+    # copied as is, a distance oracle only shares its coordinates and a condensed matrix its
+    # upper triangle. Returns (shm, spec); workers rebuild the matrix with attach_cost_matrix.
+    if isinstance(cost_matrix, np.ndarray):
+        shm, view = share_array(cost_matrix)
+        return shm, ("dense", shared_array_spec(shm, view), None)
+    if hasattr(cost_matrix, "cities"):  # DistanceOracle
+        shm, view = share_array(cost_matrix.cities)
+        cache_bytes = cost_matrix.max_rows * cost_matrix.num * cost_matrix.dtype.itemsize
+        return shm, ("oracle", shared_array_spec(shm, view),
+                     (cost_matrix.dtype.str, cache_bytes, cost_matrix.edge_weight_type))
+    if hasattr(cost_matrix, "values"):  # CondensedCostMatrix
+        shm, view = share_array(cost_matrix.values)
+        return shm, ("condensed", shared_array_spec(shm, view), cost_matrix.num)
+    raise TypeError(f"Cannot share a {type(cost_matrix).__name__} cost matrix with worker processes; "
+                    "pass a dense array, a DistanceOracle or a CondensedCostMatrix")
+
+
+def attach_cost_matrix(spec):
+    # Rebuild a cost matrix shared by share_cost_matrix in another process. Returns (shm, matrix).
+    kind, array_spec, extra = spec
+    shm, array = attach_shared_array(array_spec)
+    if kind == "oracle":
+        dtype, cache_bytes, edge_weight_type = extra
+        return shm, DistanceOracle(array, cache_bytes=cache_bytes, dtype=np.dtype(dtype),
+                                   edge_weight_type=edge_weight_type)
+    if kind == "condensed":
+        return shm, CondensedCostMatrix(array, extra)
+    return shm, array
@@ -0,0 +1,94 @@
+import importlib
+import multiprocessing
+import queue
+import random
+import time
+
+import numpy as np
+
+from Bio.src.algorithms.base import SOLVER_MODULES
+from Bio.src.algorithms.parallel import (share_array, shared_array_spec, attach_shared_array, share_cost_matrix,
+                                         attach_cost_matrix)
+from Bio.src.algorithms.termination import TerminationPolicy
+from Bio.src.instance import TSPInstance
+
+def _attach_race(cities_spec, cost_spec, metric, snapshots, stop):
+    # Pool initializer: map the shared instance once per worker process. A distance oracle or
+    # condensed matrix is rebuilt on top of its shared coordinates or upper triangle.
+    global _race_shared, _race_instance, _race_snapshots, _race_stop
+    _race_shared = [attach_shared_array(cities_spec), attach_cost_matrix(cost_spec)]
+    _race_instance = TSPInstance(_race_shared[0][1], _race_shared[1][1], metric)
+    _race_snapshots, _race_stop = snapshots, stop
+
+
+def _race_solver(name, params, seed, termination, snapshot_interval):
+    # One solver of the race in a pool worker, under its own copy of the termination policy.
+    # Snapshots go to the parent through the queue at most every snapshot_interval seconds;
+    # the shared stop event cancels the run.
+    np.random.seed(seed)
+    random.seed(seed)
+    snapshots = importlib.import_module(SOLVER_MODULES[name]).iter_solve(_race_instance, params)
+    termination.start()
+    last, last_sent = None, 0.0
+    try:
+        for last in snapshots:
+            now = time.perf_counter()
+            if now - last_sent >= snapshot_interval:
+                last_sent = now
+                _race_snapshots.put((name, last))
+            if _race_stop.is_set():
+                termination.cancel()
+            if last.iteration > 0 and termination.should_stop(last.iteration, last.best_cost):
+                break
+    finally:
+        snapshots.close()
+    return name, last, termination.reason
+
+
+def run_race(instance, solver_params, termination=None, progress=None, processes=None, snapshot_interval=0.1):
+    # Run several solvers at once, one pool process each, on the same instance. Cities and the
+    # cost matrix (or an oracle's coordinates) are placed in shared memory once; every worker builds its own
+    # TSPInstance (and k-NN graph) on top of them, so the race costs as long as its slowest solver.
+    # solver_params: {name: iter_solve params} with names from SOLVER_MODULES.
+    # termination: its limits apply to each solver separately; cancelling it stops them all.
+    # progress: called as progress(name, snapshot) on the calling thread as snapshots arrive.
+    # Returns {name: (last Snapshot, termination reason or None)}.
+    if termination is None:
+        # Every solver gets a copy, so even a run without limits can be cancelled
+        termination = TerminationPolicy()
+    termination.start()
+    cities_shm, cities = share_array(np.asarray(instance.cities, dtype=float))
+    cost_shm, cost_spec = share_cost_matrix(instance.cost_matrix)
+    snapshots = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    initargs = (shared_array_spec(cities_shm, cities), cost_spec, instance.metric, snapshots, stop)
+    seeds = np.random.randint(0, 2 ** 31 - 1, size=len(solver_params))
+
+    def deliver(block):
+        try:
+            name, snapshot = snapshots.get(timeout=0.05) if block else snapshots.get_nowait()
+        except queue.Empty:
+            return False
+        if progress is not None:
+            progress(name, snapshot)
+        return True
+
+    try:
+        with multiprocessing.Pool(processes or len(solver_params), _attach_race, initargs) as pool:
+            pending = pool.starmap_async(_race_solver, [
+                (name, params, int(seed), termination, snapshot_interval)
+                for (name, params), seed in zip(solver_params.items(), seeds)
+            ])
+            while not pending.ready():
+                if termination.cancelled:
+                    stop.set()
+                deliver(block=True)
+            results = pending.get()
+            while deliver(block=False):
+                pass
+    finally:
+        for shm in (cities_shm, cost_shm):
+            shm.close()
+            shm.unlink()
+
+    return {name: (last, reason) for name, last, reason in results}
@@ -0,0 +1,64 @@
+import time
+from collections import deque
+
+
+class TerminationPolicy:
+    """Early-stopping rules shared by every solver.
+
+    Any combination of limits can be set; None disables a limit. Solvers call start() once
+    and should_stop(iteration, best_cost) after every iteration (generation, cycle). When a
+    limit fires, `reason` names it; it stays None if the solver ran all its iterations.
+    cancel() may be called from another thread and stops the solver at its next check.
+    """
+
+    def __init__(self, max_seconds=None, target_cost=None, stall_iterations=None, min_improvement=None,
+                 improvement_window=10):
+        self.max_seconds = max_seconds
+        self.target_cost = target_cost
+        self.stall_iterations = stall_iterations
+        self.min_improvement = min_improvement  # relative, e.g. 0.001 = 0.1% over the window
+        self.improvement_window = improvement_window
+        self.cancelled = False
+        self.start()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.reason = None
+        self.best_cost = float('inf')
+        self.since_improvement = 0
+        self.history = deque(maxlen=self.improvement_window + 1)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def deadline(self):
+        # Wall-clock (time.time) deadline, for checks inside worker processes
+        if self.max_seconds is None:
+            return None
+        return time.time() + self.max_seconds - self.elapsed()
+
+    def should_stop(self, iteration, best_cost):
+        if best_cost < self.best_cost:
+            self.best_cost = best_cost
+            self.since_improvement = 0
+        else:
+            self.since_improvement += 1
+        self.history.append(self.best_cost)
+
+        if self.cancelled:
+            self.reason = "cancelled"
+        elif self.target_cost is not None and self.best_cost <= self.target_cost:
+            self.reason = f"target cost {self.target_cost:g} reached"
+        elif self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            self.reason = f"time limit of {self.max_seconds:g} s"
+        elif self.stall_iterations is not None and self.since_improvement >= self.stall_iterations:
+            self.reason = f"no improvement in {self.stall_iterations} iterations"
+        elif self.min_improvement is not None and len(self.history) == self.history.maxlen:
+            before = self.history[0]
+            if before < float('inf') and (before - self.best_cost) < self.min_improvement * before:
+                self.reason = (f"improvement below {self.min_improvement:.2%} "
+                               f"over {self.improvement_window} iterations")
+        return self.reason is not None
@@ -0,0 +1,221 @@
+# Headless batch runner: sweeps solver parameters over repetition seeds in a process pool and
+# streams one result row per run to JSONL or CSV. Never imports Qt or matplotlib.
+#
+#   python -m Bio.src.batch GA --instance berlin52.tsp --param population_size=50,100 --param generations=300 \
+#       --param mutation_rate=0.05,0.1 --seeds 0-9 --workers 4 --output runs/ga.jsonl
+#
+# Parameters are iter_solve keyword arguments of the chosen solver (for ACO: alpha, beta,
+# initial_pheromone, evap_rate, m, constant, I_max, ...). Every --param adds a grid axis;
+# --params-file adds a JSON list of parameter sets, each crossed with the grid. Re-running
+# the same command skips every (params, seed) already in the output file, so an interrupted
+# sweep resumes where it stopped. Runs only count as done under the same instance contents,
+# stopping limits and dense limit; changing any of them runs the sweep again.
+import argparse
+import ast
+import csv
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from Bio.src.algorithms.base import SOLVER_MODULES, run_snapshots
+from Bio.src.algorithms.termination import TerminationPolicy
+from Bio.src.instance import TSPInstance, DENSE_MATRIX_LIMIT, file_digest, load_instance
+from Bio.src.plotting.utils import create_cost_matrix, DistanceOracle
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process address space limit
+    resource = None
+
+FIELDS = ["key", "instance", "solver", "params", "seed", "best_cost", "runtime", "iterations", "evaluations", "stop_reason",
+          "error", "tour"]
+
+
+def parse_value(text):
+    # Python literals where possible (numbers, None, True), plain strings otherwise ("2-opt")
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def parse_seeds(text):
+    # "0-4,10" -> [0, 1, 2, 3, 4, 10]
+    seeds = []
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        seeds.extend(range(int(first), int(last or first) + 1))
+    return seeds
+
+
+def parameter_sets(grid_args, params_file=None):
+    # Every file entry crossed with the cartesian product of the --param axes
+    base_sets = [{}]
+    if params_file:
+        with open(params_file) as handle:
+            base_sets = json.load(handle)
+    axes = []
+    for arg in grid_args:
+        name, _, values = arg.partition("=")
+        axes.append([(name, parse_value(value)) for value in values.split(",")])
+    return [dict(base, **dict(combination)) for base in base_sets for combination in itertools.product(*axes)]
+
+
+def run_key(instance_id, solver, params, seed, limits, dense_limit):
+    # instance_id: the file's hash for loaded instances, so moved copies still resume and
+    # different files with the same name do not collide
+    return json.dumps({"instance": instance_id, "solver": solver, "params": params, "seed": seed,
+                       "limits": limits, "dense_limit": dense_limit}, sort_keys=True)
+
+
+def completed_keys(path):
+    # Keys of the runs already in the output file. Failed runs and a row cut off by an
+    # interruption are not counted, so they are run again.
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="") as handle:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(handle))
+        else:
+            rows = []
+            for line in handle:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    pass
+    return {row["key"] for row in rows if row.get("key") and not row.get("error") and row.get("tour")}
+
+
+class ResultWriter:
+    """Appends result rows to a JSONL or CSV file (chosen by extension), flushing every row."""
+
+    def __init__(self, path):
+        self.csv = path.endswith(".csv")
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            # Start on a fresh line if the previous run was killed mid-row
+            with open(path, "rb") as handle:
+                handle.seek(-1, os.SEEK_END)
+                torn = handle.read(1) != b"\n"
+        self.handle = open(path, "a", newline="")
+        if not new and torn:
+            self.handle.write("\n")
+        if self.csv:
+            self.writer = csv.DictWriter(self.handle, FIELDS)
+            if new:
+                self.writer.writeheader()
+
+    def write(self, row):
+        if self.csv:
+            row = dict(row, params=json.dumps(row["params"], sort_keys=True),
+                       tour=" ".join(map(str, row["tour"] or [])))
+            self.writer.writerow(row)
+        else:
+            self.handle.write(json.dumps(row) + "\n")
+        self.handle.flush()
+
+    def close(self):
+        self.handle.close()
+
+
+def _init_worker(cities, instance_path, dense_limit, memory_mb):
+    # Pool initializer: cap the worker's address space, then build the instance once. A loaded
+    # instance comes memory-mapped from the cache the parent filled, so workers share its pages.
+    global _batch_instance
+    sys.stdout = open(os.devnull, "w")  # Solvers' per-iteration prints; results go to the file
+    if memory_mb and resource is not None:
+        limit = memory_mb * 2 ** 20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if instance_path:
+        _batch_instance = load_instance(instance_path, dense_limit=dense_limit)
+        return
+    cost_matrix = create_cost_matrix(cities) if len(cities) <= dense_limit else DistanceOracle(cities)
+    _batch_instance = TSPInstance(cities, cost_matrix)
+
+
+def _run_one(task):
+    # One (solver, params, seed) run in a pool worker; errors become rows instead of killing the sweep
+    key, instance, solver, params, seed, limits = task
+    np.random.seed(seed)
+    random.seed(seed)
+    termination = TerminationPolicy(**limits)
+    row = {"key": key, "instance": instance, "solver": solver, "params": params, "seed": seed, "best_cost": None, "runtime": None,
+           "iterations": None, "evaluations": None, "stop_reason": None, "error": None, "tour": None}
+    started = time.perf_counter()
+    try:
+        iter_solve = importlib.import_module(SOLVER_MODULES[solver]).iter_solve
+        last = run_snapshots(iter_solve(_batch_instance, params), termination)
+        row.update(best_cost=float(last.best_cost), iterations=int(last.iteration),
+                   evaluations=int(last.evaluations), stop_reason=termination.reason,
+                   tour=np.asarray(last.best_tour).tolist())
+    except MemoryError:
+        row["error"] = "out of memory"
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["runtime"] = time.perf_counter() - started
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run parameter sweeps of the TSP solvers without the GUI")
+    parser.add_argument("solver", choices=sorted(SOLVER_MODULES))
+    parser.add_argument("--instance", help="TSPLIB .tsp or CSV coordinates file instead of random cities")
+    parser.add_argument("--nodes", type=int, default=100, help="number of random cities")
+    parser.add_argument("--instance-seed", type=int, default=0, help="seed of the random cities")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2",
+                        help="grid axis of iter_solve parameter values (repeatable)")
+    parser.add_argument("--params-file", help="JSON list of parameter sets, crossed with the grid")
+    parser.add_argument("--seeds", default="0", help="repetition seeds, e.g. 0-9 or 1,5,7")
+    parser.add_argument("--output", default="batch_results.jsonl", help=".jsonl or .csv, appended to")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-memory-mb", type=int, help="address space limit per worker process")
+    parser.add_argument("--max-tasks-per-child", type=int, default=10,
+                        help="runs before a worker is replaced, returning its memory")
+    parser.add_argument("--dense-limit", type=int, default=DENSE_MATRIX_LIMIT,
+                        help="above this many cities distances are computed on demand")
+    parser.add_argument("--time-limit", type=float, help="seconds per run")
+    parser.add_argument("--target-cost", type=float)
+    parser.add_argument("--stall", type=int, help="stop a run after this many iterations without improvement")
+    args = parser.parse_args(argv)
+
+    if args.instance:
+        load_instance(args.instance, dense_limit=args.dense_limit)  # Fill the cache once, before the workers
+        cities, instance = None, os.path.basename(args.instance)
+        instance_id = "sha256:" + file_digest(args.instance)
+    else:
+        cities = np.random.RandomState(args.instance_seed).rand(args.nodes, 2) * 100
+        instance = instance_id = f"random-{args.nodes}-seed{args.instance_seed}"
+    limits = {"max_seconds": args.time_limit, "target_cost": args.target_cost, "stall_iterations": args.stall}
+    done = completed_keys(args.output)
+    tasks = []
+    for params in parameter_sets(args.param, args.params_file):
+        for seed in parse_seeds(args.seeds):
+            key = run_key(instance_id, args.solver, params, seed, limits, args.dense_limit)
+            if key not in done:
+                tasks.append((key, instance, args.solver, params, seed, limits))
+    print(f"{len(tasks)} runs to do, {len(done)} already in {args.output}", file=sys.stderr)
+    if not tasks:
+        return
+
+    writer = ResultWriter(args.output)
+    try:
+        with multiprocessing.Pool(args.workers, _init_worker,
+                                  (cities, args.instance, args.dense_limit, args.max_memory_mb),
+                                  maxtasksperchild=args.max_tasks_per_child) as pool:
+            for count, row in enumerate(pool.imap_unordered(_run_one, tasks), 1):
+                writer.write(row)
+                outcome = row["error"] or f"cost {row['best_cost']:.2f} in {row['runtime']:.2f}s"
+                print(f"[{count}/{len(tasks)}] {row['params']} seed={row['seed']}: {outcome}", file=sys.stderr)
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,19 +8,29 @@ descriptions = {
     "Initial Pheromone (ACO):": "Sets the starting pheromone level on all paths. A higher initial value can lead to faster convergence but may cause premature exploitation of suboptimal routes.",
     "Number of Ants (ACO):": "Determines how many ants (agents) explore paths in each iteration. More ants improve coverage and solution diversity but increase computation time.",
     "Deposit Constant (ACO):": "Controls the amount of pheromone each ant deposits on the path it takes. Larger values intensify the reinforcement of good paths, speeding up convergence.",
+    "Candidate List Size (ACO):": "Number of nearest neighbours each ant considers from every city. 0 considers all cities; values around 10-20 make large instances much faster and use far less memory.",
+    "Colonies (ACO):": "Number of independent ant colonies, each running in its own process. Colonies share their best tour every few iterations, so more colonies use more CPU cores without slowing the run down.",
+    "Stagnation Limit (ACO):": "Number of iterations without a better tour after which the pheromone trails are reset (MMAS and ACS). The reset also happens when every ant builds the same tour. 0 disables restarts.",
+    "Exploitation q0 (ACS):": "Probability that an ant simply takes the most attractive edge instead of choosing randomly. Higher values exploit known good edges, lower values explore more.",
 
     "Number of Particles (PSO):": "Sets how many candidate solutions (particles) explore the search space. More particles increase coverage but require more computation.",
     "Inertia Weight (w - PSO):": "Controls momentum: higher values encourage exploration, lower values focus on refining current paths.",
     "Cognitive Coefficient (c1 - PSO):": "Defines how much each particle is influenced by its own past best solution (self-learning).",
     "Social Coefficient (c2 - PSO):": "Defines how much each particle is influenced by the best solution found by others (swarm intelligence).",
-"Max Velocity (v_max - PSO):": "Limits how much a particle's position can change in a single iteration. Lower values promote fine-tuned local search, while higher values allow broader exploration. It helps balance between exploration and exploitation in PSO.",
+"Max Velocity (v_max - PSO):": "Limits how much a particle's position can change in a single iteration: a velocity is a sequence of city swaps and holds at most v_max of them. Lower values promote fine-tuned local search, while higher values allow broader exploration. It helps balance between exploration and exploitation in PSO.",
 
     "Population Size (GA):": "Specifies the number of potential solutions (individuals) in each generation. Larger populations offer more diversity.",
     "Generations (GA):": "Sets how many evolutionary cycles will occur. More generations allow the algorithm to refine better solutions.",
     "Mutation Rate (GA):": "Probability that random changes will be introduced in offspring. Encourages diversity and helps escape local optima.A higher Mutation encourages more change in the solution, while a lower one preserves optimal solutions",
+    "Local Search Share (GA):": "Fraction of each generation's best children that are improved with the selected local search (2-opt / Or-opt) before the next generation. 1.0 improves every child; lower values are faster.",
+    "Islands (GA):": "Number of sub-populations evolved in parallel processes, each with the chosen population size. Every few generations the best tours migrate between islands along the selected topology, which keeps diversity high and uses more CPU cores.",
 
     "Swarm Size (GBC):": "Specifies the number of individual solutions (bees) in the colony. A larger swarm may explore the solution space more thoroughly, but increases computational time.",
     "Max Cycles (GBC):": "Defines the maximum number of iterations the algorithm will perform. Each cycle involves all bees searching for better solutions and updating the colony’s knowledge.",
-    "Trial Limit (GBC):": "The number of unsuccessful attempts a solution (bee) can make before it is abandoned and replaced. Helps the algorithm escape local optima by introducing new random solutions."
+    "Trial Limit (GBC):": "The number of unsuccessful attempts a solution (bee) can make before it is abandoned and replaced. Helps the algorithm escape local optima by introducing new random solutions.",
+    "Time Limit (s):": "Stops the run after this many seconds and returns the best tour found so far. Leave blank for no time limit.",
+    "Target Cost:": "Stops as soon as a tour at least this short is found. Leave blank to disable.",
+    "Stall Iterations:": "Stops when the best cost has not improved for this many iterations (generations for GA, cycles for GBC). Leave blank to disable.",
+    "Min Improvement (%):": "Stops when the best cost improved by less than this percentage over the last 10 iterations. Leave blank to disable.",
 }
 
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from Bio.src.plotting.utils import (create_cost_matrix, nearest_neighbour_lists, pairwise_distances, tsplib_round,
+                                   DistanceOracle)
+
+# Above this many cities instances use a DistanceOracle instead of a dense cost matrix
+DENSE_MATRIX_LIMIT = 5000
+
+# Loaded instances are cached here, one directory of .npy files per file hash
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tsp-instances")
+CACHE_VERSION = 2
+
+
+class GridIndex:
+    """Uniform grid over the cities, sized for a few cities per cell."""
+
+    def __init__(self, cities, points_per_cell=8):
+        self.cities = np.asarray(cities, dtype=float)
+        num = len(self.cities)
+        self.origin = self.cities.min(axis=0)
+        extent = np.maximum(self.cities.max(axis=0) - self.origin, 1e-12)
+        self.cell = max(np.sqrt(extent[0] * extent[1] * points_per_cell / max(num, 1)), extent.max() / 4096, 1e-12)
+        self.dims = np.maximum(np.ceil(extent / self.cell).astype(np.int64), 1)
+
+        cells = self.cell_of(self.cities)
+        cell_ids = cells[:, 1] * self.dims[0] + cells[:, 0]
+        self.order = np.argsort(cell_ids, kind='stable')
+        counts = np.bincount(cell_ids, minlength=self.dims[0] * self.dims[1])
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+        self.cell_ids = cell_ids
+
+    def cell_of(self, points):
+        return np.minimum(((points - self.origin) // self.cell).astype(np.int64), self.dims - 1)
+
+    def points_in_block(self, cx, cy, radius):
+        # City indices in the (2 * radius + 1)^2 block of cells around (cx, cy)
+        x0, x1 = max(cx - radius, 0), min(cx + radius, self.dims[0] - 1)
+        y0, y1 = max(cy - radius, 0), min(cy + radius, self.dims[1] - 1)
+        rows = [self.order[self.starts[y * self.dims[0] + x0]:self.starts[y * self.dims[0] + x1 + 1]]
+                for y in range(y0, y1 + 1)]
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+
+    def covers_everything(self, cx, cy, radius):
+        return (cx - radius <= 0 and cy - radius <= 0 and
+                cx + radius >= self.dims[0] - 1 and cy + radius >= self.dims[1] - 1)
+
+    def knn(self, k):
+        # k nearest neighbours of every city, cell by cell. A block of radius r is searched and
+        # widened until the k-th distance is within r cells, so every answer is exact.
+        num = len(self.cities)
+        k = min(k, num - 1)
+        indices = np.empty((num, k), dtype=np.int32)
+        distances = np.empty((num, k), dtype=float)
+        occupied = np.nonzero(np.diff(self.starts))[0]
+
+        for cell_id in occupied:
+            members = self.order[self.starts[cell_id]:self.starts[cell_id + 1]]
+            cx, cy = cell_id % self.dims[0], cell_id // self.dims[0]
+            pending = members
+            radius = 1
+            while len(pending):
+                candidates = self.points_in_block(cx, cy, radius)
+                if len(candidates) > k:
+                    diff = self.cities[pending][:, None, :] - self.cities[candidates][None, :, :]
+                    dist = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+                    dist[pending[:, None] == candidates[None, :]] = np.inf
+                    nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+                    near_dist = np.take_along_axis(dist, nearest, axis=1)
+                    order = np.argsort(near_dist, axis=1)
+                    near_dist = np.take_along_axis(near_dist, order, axis=1)
+                    nearest = candidates[np.take_along_axis(nearest, order, axis=1)]
+
+                    # Exact once the k-th neighbour is closer than the edge of the searched block
+                    done = (near_dist[:, -1] <= radius * self.cell) | self.covers_everything(cx, cy, radius)
+                    indices[pending[done]] = nearest[done]
+                    distances[pending[done]] = near_dist[done]
+                    pending = pending[~done]
+                radius += 1
+        return indices, distances
+
+    def nearest(self, point, mask, start_radius=1):
+        # Nearest city to `point` among those where mask is True, searching outwards ring by ring
+        cx, cy = self.cell_of(np.asarray(point, dtype=float)[None, :])[0]
+        radius = start_radius
+        while True:
+            candidates = self.points_in_block(cx, cy, radius)
+            candidates = candidates[mask[candidates]]
+            if len(candidates):
+                diff = self.cities[candidates] - point
+                dist = np.einsum('ij,ij->i', diff, diff)
+                best = np.argmin(dist)
+                if np.sqrt(dist[best]) <= radius * self.cell or self.covers_everything(cx, cy, radius):
+                    return int(candidates[best])
+            elif self.covers_everything(cx, cy, radius):
+                return -1
+            radius = radius * 2 if radius > 8 else radius + 1
+
+
+class KNNGraph:
+    """Sparse k-nearest-neighbour graph in CSR form (indptr, indices, distances)."""
+
+    def __init__(self, indices, distances):
+        num, k = indices.shape
+        self.k = k
+        self.indptr = np.arange(0, num * k + 1, k, dtype=np.int64)
+        self.indices = indices.ravel()
+        self.distances = distances.ravel()
+
+    def neighbours(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def as_lists(self):
+        # (n, k) neighbour array; every row has k entries so this is a view of the CSR indices
+        return self.indices.reshape(-1, self.k)
+
+    def edges(self):
+        # Candidate edges as (sources, targets, distances)
+        sources = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        return sources, self.indices, self.distances
+
+
+class TSPInstance:
+    """Cities, their cost matrix and per-instance precomputations shared by every solver.
+
+    Spatial structures are built lazily and cached, so mutation, local search and ACO
+    construction can ask for candidate edges or the nearest unvisited city without touching
+    O(n^2) data. metric="euclidean" builds them from coordinates; any other metric (for
+    example explicit TSPLIB matrices) falls back to the cost matrix rows.
+    """
+
+    def __init__(self, cities, cost_matrix=None, metric="euclidean", name=None, knn=None):
+        self.cities = np.asarray(cities, dtype=float)
+        self.cost_matrix = cost_matrix if cost_matrix is not None else create_cost_matrix(self.cities)
+        self.metric = metric
+        self.name = name
+        self._grid = None
+        self._knn = knn  # Precomputed KNNGraph, e.g. from the instance cache
+
+    def __len__(self):
+        return len(self.cities)
+
+    @property
+    def grid(self):
+        if self._grid is None:
+            self._grid = GridIndex(self.cities)
+        return self._grid
+
+    def knn_graph(self, k=10):
+        # Cached; a request for fewer neighbours is served from a larger cached graph
+        if self._knn is None or self._knn.k < min(k, len(self) - 1):
+            if self.metric == "euclidean":
+                indices, distances = self.grid.knn(k)
+            else:
+                indices = nearest_neighbour_lists(self.cost_matrix, k)
+                distances = np.asarray(self.cost_matrix[np.arange(len(self))[:, None], indices], dtype=float)
+            self._knn = KNNGraph(indices, distances)
+        return self._knn
+
+    def neighbour_lists(self, k=10):
+        return self.knn_graph(k).as_lists()[:, :min(k, len(self) - 1)]
+
+    def candidate_edges(self, k=10):
+        return self.knn_graph(k).edges()
+
+    def nearest_unvisited(self, node, unvisited):
+        # The first unvisited city in the sorted k-NN list is the nearest overall; otherwise
+        # search the grid (or the cost matrix row for non-Euclidean instances).
+        graph = self.knn_graph()
+        neighbours = graph.neighbours(node)
+        free = unvisited[neighbours]
+        if free.any():
+            return int(neighbours[np.argmax(free)])
+        if self.metric == "euclidean":
+            return self.grid.nearest(self.cities[node], unvisited)
+        row = np.where(unvisited, self.cost_matrix[node], np.inf)
+        return int(np.argmin(row)) if np.isfinite(row).any() else -1
+
+
+def tsplib_cost_matrix(cities, edge_weight_type, block_size=1024):
+    # Dense cost matrix with TSPLIB's integer distance functions, built in row blocks
+    num = len(cities)
+    matrix = np.empty((num, num))
+    if edge_weight_type == "GEO":
+        # Coordinates are DDD.MM degrees and minutes; distances in km on TSPLIB's idealised sphere
+        degrees = np.trunc(cities)
+        radians = np.pi * (degrees + 5.0 * (cities - degrees) / 3.0) / 180.0
+        latitude, longitude = radians[:, 0], radians[:, 1]
+    for start in range(0, num, block_size):
+        stop = min(start + block_size, num)
+        if edge_weight_type == "GEO":
+            q1 = np.cos(longitude[start:stop, None] - longitude[None, :])
+            q2 = np.cos(latitude[start:stop, None] - latitude[None, :])
+            q3 = np.cos(latitude[start:stop, None] + latitude[None, :])
+            cosine = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+            block = np.trunc(6378.388 * np.arccos(cosine) + 1.0)
+        else:
+            block = tsplib_round(pairwise_distances(cities[start:stop], cities), edge_weight_type)
+        matrix[start:stop] = block
+    np.fill_diagonal(matrix, np.inf)
+    return matrix
+
+
+def explicit_cost_matrix(weights, num, edge_weight_format):
+    # Square matrix from an EDGE_WEIGHT_SECTION. Column-wise triangles list the same numbers
+    # as the opposite row-wise triangle, so they share an index order.
+    formats = {
+        "UPPER_ROW": lambda: np.triu_indices(num, 1), "LOWER_COL": lambda: np.triu_indices(num, 1),
+        "LOWER_ROW": lambda: np.tril_indices(num, -1), "UPPER_COL": lambda: np.tril_indices(num, -1),
+        "UPPER_DIAG_ROW": lambda: np.triu_indices(num), "LOWER_DIAG_COL": lambda: np.triu_indices(num),
+        "LOWER_DIAG_ROW": lambda: np.tril_indices(num), "UPPER_DIAG_COL": lambda: np.tril_indices(num),
+    }
+    if edge_weight_format == "FULL_MATRIX":
+        matrix = weights[:num * num].reshape(num, num).astype(float)
+    elif edge_weight_format in formats:
+        rows, cols = formats[edge_weight_format]()
+        matrix = np.zeros((num, num))
+        matrix[rows, cols] = weights[:len(rows)]
+        matrix[cols, rows] = weights[:len(rows)]
+    else:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT {edge_weight_format}")
+    np.fill_diagonal(matrix, np.inf)
+    return matrix
+
+
+def read_tsplib(path):
+    # Parse a TSPLIB .tsp file. Returns (name, cities, cost_matrix, edge_weight_type); cities is
+    # None for EXPLICIT instances without display data, cost_matrix is None unless EXPLICIT.
+    header, sections, current = {}, {}, None
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line == "EOF":
+                continue
+            keyword = line.split(":")[0].strip().upper()
+            if keyword.endswith("_SECTION"):
+                current = sections.setdefault(keyword, [])
+            elif ":" in line and keyword.replace("_", "").isalpha():
+                header[keyword] = line.split(":", 1)[1].strip()
+                current = None
+            elif current is not None:
+                current.append(line)
+
+    name = header.get("NAME", os.path.splitext(os.path.basename(path))[0])
+    num = int(header["DIMENSION"])
+    edge_weight_type = header.get("EDGE_WEIGHT_TYPE", "EUC_2D").upper()
+    if edge_weight_type not in ("EUC_2D", "CEIL_2D", "ATT", "GEO", "EXPLICIT"):
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE {edge_weight_type}")
+
+    def coordinates(section):
+        values = np.array(" ".join(sections[section]).split(), dtype=float).reshape(-1, 3)
+        cities = np.empty((num, 2))
+        cities[values[:, 0].astype(int) - 1] = values[:, 1:]  # Nodes are numbered from 1
+        return cities
+
+    if edge_weight_type == "EXPLICIT":
+        weights = np.array(" ".join(sections["EDGE_WEIGHT_SECTION"]).split(), dtype=float)
+        cost_matrix = explicit_cost_matrix(weights, num, header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper())
+        cities = coordinates("DISPLAY_DATA_SECTION") if "DISPLAY_DATA_SECTION" in sections else None
+        return name, cities, cost_matrix, edge_weight_type
+    return name, coordinates("NODE_COORD_SECTION"), None, edge_weight_type
+
+
+def read_csv_cities(path):
+    # Coordinates from a CSV file: the last two columns of every numeric row (so "x,y" and
+    # "id,x,y" both work); header and blank lines are skipped.
+    cities = []
+    with open(path) as handle:
+        for line in handle:
+            fields = line.replace(";", ",").replace("\t", ",").split(",")
+            try:
+                cities.append([float(fields[-2]), float(fields[-1])])
+            except (ValueError, IndexError):
+                continue
+    if len(cities) < 3:
+        raise ValueError(f"{path}: expected at least 3 rows of x,y coordinates")
+    return np.array(cities)
+
+
+def build_instance(path, dense_limit=DENSE_MATRIX_LIMIT):
+    # Parse a .tsp or .csv file into a TSPInstance, with no caching
+    name = os.path.splitext(os.path.basename(path))[0]
+    if path.lower().endswith(".csv"):
+        cities = read_csv_cities(path)
+        cost_matrix = create_cost_matrix(cities) if len(cities) <= dense_limit else DistanceOracle(cities)
+        return TSPInstance(cities, cost_matrix, "euclidean", name)
+
+    name, cities, cost_matrix, edge_weight_type = read_tsplib(path)
+    if cost_matrix is None:
+        if edge_weight_type != "GEO" and len(cities) > dense_limit:
+            # Too large for a matrix: the same rounded distances, computed on demand
+            cost_matrix = DistanceOracle(cities, edge_weight_type=edge_weight_type)
+        else:
+            cost_matrix = tsplib_cost_matrix(cities, edge_weight_type)
+    if cities is None:
+        # No coordinates to draw: lay the cities out on a circle
+        from Bio.src.algorithms.ACO import cost_matrix_to_coords
+        cities = np.array(cost_matrix_to_coords(cost_matrix))
+    metric = "euclidean" if edge_weight_type in ("EUC_2D", "CEIL_2D", "ATT") else "matrix"
+    return TSPInstance(cities, cost_matrix, metric, name)
+
+
+def file_digest(path):
+    # SHA-256 of the file's contents: identifies an instance independently of where it lives
+    with open(path, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def load_instance(path, k=20, cache_dir=CACHE_DIR, dense_limit=DENSE_MATRIX_LIMIT):
+    # Load a .tsp or .csv instance through the on-disk cache. The cache holds coordinates, the
+    # dense cost matrix (when there is one) and the k-NN graph as .npy files keyed by the file's
+    # hash; they are memory-mapped on reopening, so nothing O(n^2) is rebuilt.
+    entry = os.path.join(cache_dir, f"{file_digest(path)}-v{CACHE_VERSION}-k{k}-d{dense_limit}")
+
+    if os.path.exists(os.path.join(entry, "meta.json")):
+        with open(os.path.join(entry, "meta.json")) as handle:
+            meta = json.load(handle)
+
+        def cached(array):
+            return np.load(os.path.join(entry, array + ".npy"), mmap_mode="r")
+
+        cities = cached("cities")
+        cost_matrix = (cached("cost_matrix") if meta["dense"]
+                       else DistanceOracle(cities, edge_weight_type=meta["edge_weight_type"]))
+        knn = KNNGraph(cached("knn_indices"), cached("knn_distances"))
+        return TSPInstance(cities, cost_matrix, meta["metric"], meta["name"], knn)
+
+    instance = build_instance(path, dense_limit)
+    graph = instance.knn_graph(k)
+    dense = isinstance(instance.cost_matrix, np.ndarray)
+    edge_weight_type = None if dense else instance.cost_matrix.edge_weight_type
+    arrays = {"cities": instance.cities, "knn_indices": graph.as_lists(),
+              "knn_distances": graph.distances.reshape(-1, graph.k)}
+    if dense:
+        arrays["cost_matrix"] = instance.cost_matrix
+
+    # Write to a scratch directory and rename it into place, so readers never see half an entry
+    scratch = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        scratch = tempfile.mkdtemp(dir=cache_dir)
+        for array_name, array in arrays.items():
+            np.save(os.path.join(scratch, array_name + ".npy"), np.ascontiguousarray(array))
+        with open(os.path.join(scratch, "meta.json"), "w") as handle:
+            json.dump({"name": instance.name, "metric": instance.metric, "dense": dense,
+                       "edge_weight_type": edge_weight_type, "source": path}, handle)
+        os.replace(scratch, entry)
+    except OSError as e:
+        # A read-only or full cache only costs the next load its speed
+        print(f"Could not cache {path}: {e}")
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return instance
@@ -0,0 +1,140 @@
+import time
+
+import numpy as np
+from matplotlib.transforms import Bbox
+
+from Bio.src.plotting.utils import EdgeConstraintSet
+
+
+class LiveTourPlot:
+    """Animates a solver's best tour on an existing axes without rebuilding it.
+
+    The path, start marker, bridges and title are created once as animated artists; every
+    set_data() only swaps their data and blits them over a cached background, at most max_fps
+    times a second. Snapshots arriving faster than that are dropped (the newest is kept for
+    flush()), so drawing never holds the solver back. Only the axes and its title are blitted,
+    so several live plots can share one figure. Call close() before reusing the axes.
+    """
+
+    def __init__(self, ax, cities, bridge=None, max_fps=20):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.cities = np.asarray(cities, dtype=float)
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_draw = 0.0
+        self.pending = None
+        self.background = None
+        self.region = None
+        if bridge and not hasattr(bridge, "uses"):
+            bridge = EdgeConstraintSet([bridge], len(self.cities))
+        self.constraints = bridge or None
+
+        # Artists are created once; only their data changes afterwards
+        self.path, = ax.plot([], [], 'bo-', markersize=8, label="Cities & Path", animated=True)
+        self.start, = ax.plot([], [], 'ro', markersize=10, label="Start", animated=True)
+        self.bridges, = ax.plot([], [], 'r--', linewidth=3, label="Mandatory Bridge", animated=True)
+        self.title = ax.set_title("")
+        self.title.set_animated(True)
+        self.artists = [self.path, self.start, self.bridges, self.title]
+
+        # Empty lines do not autoscale, so fix the limits to the cities with a small margin
+        low, high = self.cities.min(axis=0), self.cities.max(axis=0)
+        margin = (high - low) * 0.05 + 1e-9
+        ax.set_xlim(low[0] - margin[0], high[0] + margin[0])
+        ax.set_ylim(low[1] - margin[1], high[1] + margin[1])
+        legend = ax.legend(handles=self.artists[:3] if self.constraints is not None else self.artists[:2])
+        legend.set_animated(True)  # Drawn over the path, as a full redraw would
+        self.artists.append(legend)
+
+        # A full redraw (first frame, resize) refreshes the cached background
+        self.draw_cid = self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def set_data(self, tour, title=""):
+        tour = np.asarray(tour)
+        if len(tour) > 1 and tour[0] == tour[-1]:
+            tour = tour[:-1]  # closed tours (ACO results) would hide a bridge on the first edge
+        self.pending = (tour, title)
+        if time.perf_counter() - self.last_draw >= self.min_interval:
+            self.flush()
+
+    def flush(self):
+        # Draw the newest dropped snapshot, if any
+        if self.pending is None:
+            return
+        tour, title = self.pending
+        self.pending = None
+        self.last_draw = time.perf_counter()
+        self.update_artists(tour, title)
+        if self.background is None:
+            self.canvas.draw()  # on_draw caches the background and draws the artists
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.region)
+
+    def update_artists(self, tour, title):
+        closed = self.cities[np.append(tour, tour[0])]
+        self.path.set_data(closed[:, 0], closed[:, 1])
+        self.start.set_data(closed[:1, 0], closed[:1, 1])
+        self.title.set_text(title)
+
+        # Only bridges the tour uses, as one line broken by NaN rows
+        if self.constraints is not None:
+            edges = self.constraints.edges[self.constraints.uses(tour)]
+            segments = np.full((len(edges), 3, 2), np.nan)
+            segments[:, :2] = self.cities[edges]
+            segments = segments.reshape(-1, 2)
+            self.bridges.set_data(segments[:, 0], segments[:, 1])
+
+    def draw_artists(self):
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def on_draw(self, event):
+        # The axes plus a band above it for the title
+        figure_box, box = self.ax.figure.bbox, self.ax.bbox
+        title_height = 2.5 * self.title.get_fontsize() * self.ax.figure.dpi / 72
+        self.region = Bbox.from_extents(box.x0, box.y0, box.x1, min(box.y1 + title_height, figure_box.y1))
+        self.background = self.canvas.copy_from_bbox(self.region)
+        self.draw_artists()
+
+    def close(self):
+        # Hand the axes back to ordinary drawing
+        self.canvas.mpl_disconnect(self.draw_cid)
+        for artist in self.artists:
+            artist.set_animated(False)
+
+
+class LiveCostChart:
+    """Best cost against elapsed time, one line per solver, for comparing a race live.
+
+    add() only records the point; the lines are rescaled and the figure redrawn at most
+    max_fps times a second (a full redraw, which also refreshes any LiveTourPlot backgrounds).
+    """
+
+    def __init__(self, ax, names, max_fps=2):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_draw = 0.0
+        self.points = {name: ([], []) for name in names}
+        self.lines = {name: ax.plot([], [], drawstyle='steps-post', label=name)[0] for name in names}
+        ax.set_title("Best Cost vs Time")
+        ax.set_xlabel("Elapsed (s)")
+        ax.set_ylabel("Best Cost")
+        ax.legend(loc="upper right")
+
+    def add(self, name, elapsed, best_cost):
+        times, costs = self.points[name]
+        times.append(elapsed)
+        costs.append(best_cost)
+        if time.perf_counter() - self.last_draw >= self.min_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_draw = time.perf_counter()
+        for name, (times, costs) in self.points.items():
+            self.lines[name].set_data(times, costs)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
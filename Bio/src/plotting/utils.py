@@ -1,5 +1,5 @@
-import matplotlib.pyplot as plt
 import numpy as np
+from collections import OrderedDict
 
 def plot_tsp_solution(ax, cities, tour, title="TSP Solution", bridge=None):
     ax.clear()
@@ -7,18 +7,19 @@ def plot_tsp_solution(ax, cities, tour, title="TSP Solution", bridge=None):
     ax.plot(x, y, 'bo-', markersize=8, label="Cities & Path")
     ax.plot(x[0], y[0], 'ro', markersize=10, label="Start")
 
-    # Only draw bridge if it's actually used
+    # Only draw bridges the tour actually uses. bridge is one (a, b) pair or an EdgeConstraintSet.
     if bridge:
-        a, b = bridge
-        for i in range(len(tour)):
-            x1, x2 = tour[i], tour[(i + 1) % len(tour)]
-            if (x1 == a and x2 == b) or (x1 == b and x2 == a):
-                ax.plot(
-                    [cities[a][0], cities[b][0]],
-                    [cities[a][1], cities[b][1]],
-                    'r--', linewidth=3, label="Mandatory Bridge"
-                )
-                break  # stop after drawing
+        constraints = bridge if hasattr(bridge, "uses") else EdgeConstraintSet([bridge], len(cities))
+        open_tour = np.asarray(tour)
+        if len(open_tour) > 1 and open_tour[0] == open_tour[-1]:
+            open_tour = open_tour[:-1]  # ACO returns closed tours; positions need each city once
+        used = constraints.uses(open_tour)
+        for drawn, (a, b) in enumerate(constraints.edges[used]):
+            ax.plot(
+                [cities[a][0], cities[b][0]],
+                [cities[a][1], cities[b][1]],
+                'r--', linewidth=3, label="Mandatory Bridge" if drawn == 0 else None
+            )
 
     ax.set_title(title)
     ax.legend()
@@ -26,39 +27,301 @@ def plot_tsp_solution(ax, cities, tour, title="TSP Solution", bridge=None):
 
 
 def apply_mandatory_bridge(cost_matrix, city_a, city_b, bridge_cost=1e-5):
-    cost_matrix = cost_matrix.copy()
+    # Single-bridge helper kept for existing callers; returns a penalised copy
+    constraints = EdgeConstraintSet([(city_a, city_b)], len(cost_matrix), bridge_cost=bridge_cost)
+    return constraints.apply(cost_matrix.copy())
 
-    # Step 1: Apply very low cost for the bridge
-    cost_matrix[city_a, city_b] = bridge_cost
-    cost_matrix[city_b, city_a] = bridge_cost
 
-    # Step 2 (Optional): Slightly penalize other connections *if they are valid*
-    penalty = np.nanmean(cost_matrix[np.isfinite(cost_matrix)]) * 0.5
+def tour_positions(tours):
+    # Position index: pos[..., city] is the city's index in the tour
+    tours = np.asarray(tours)
+    pos = np.empty_like(tours)
+    np.put_along_axis(pos, tours, np.broadcast_to(np.arange(tours.shape[-1]), tours.shape), axis=-1)
+    return pos
 
-    for i in range(len(cost_matrix)):
-        if i != city_b and np.isfinite(cost_matrix[city_a, i]):
-            cost_matrix[city_a, i] += penalty
-            cost_matrix[i, city_a] += penalty
-        if i != city_a and np.isfinite(cost_matrix[city_b, i]):
-            cost_matrix[city_b, i] += penalty
-            cost_matrix[i, city_b] += penalty
 
-    # Step 3: Reset bridge cost just in case penalty was applied to it
-    cost_matrix[city_a, city_b] = bridge_cost
-    cost_matrix[city_b, city_a] = bridge_cost
+class EdgeConstraintSet:
+    """Mandatory edges ("bridges") shared by the cost matrix, the solvers and the plot.
 
-    return cost_matrix
+    Soft constraints make each bridge nearly free and penalise every other edge at its end
+    cities (apply). Hard constraints are kept by repair, which moves each chain of mandatory
+    edges back together, so operators never leave a tour that breaks one.
+    """
 
+    def __init__(self, edges, num_nodes, bridge_cost=1e-5, penalty_factor=0.5, hard=False,
+                 missing_penalty=1000.0):
+        edges = np.array(sorted({(min(a, b), max(a, b)) for a, b in edges}), dtype=np.int64).reshape(-1, 2)
+        if len(edges) and (edges.min() < 0 or edges.max() >= num_nodes or (edges[:, 0] == edges[:, 1]).any()):
+            raise ValueError(f"Bridge cities must be distinct and between 0 and {num_nodes - 1}")
+        self.edges = edges
+        self.a, self.b = edges[:, 0], edges[:, 1]
+        self.num_nodes = num_nodes
+        self.bridge_cost = bridge_cost
+        self.penalty_factor = penalty_factor
+        self.hard = hard
+        self.missing_penalty = missing_penalty
+        self.penalty = 0.0
+        self._build_chains()
 
-def create_cost_matrix(cities):
-    num = len(cities)
-    matrix = np.zeros((num, num))
-    for i in range(num):
-        for j in range(num):
-            if i == j:
-                matrix[i][j] = np.inf
+    def __len__(self):
+        return len(self.edges)
+
+    def _build_chains(self):
+        # Mandatory edges form vertex-disjoint paths. For repair every city on a path gets its
+        # head and a fractional offset, so sorting by (head position + offset) rebuilds the path.
+        degree = np.bincount(self.edges.ravel(), minlength=self.num_nodes)
+        if (degree > 2).any():
+            raise ValueError("A city can be an end of at most two bridges")
+        adjacent = {}
+        for a, b in self.edges.tolist():
+            adjacent.setdefault(a, []).append(b)
+            adjacent.setdefault(b, []).append(a)
+
+        members, heads, offsets = [], [], []
+        seen = set()
+        for start in adjacent:
+            if start in seen or len(adjacent[start]) != 1:
+                continue
+            chain, previous, city = [start], None, start
+            while True:
+                following = [c for c in adjacent[city] if c != previous]
+                if not following:
+                    break
+                previous, city = city, following[0]
+                chain.append(city)
+            seen.update(chain)
+            members.extend(chain)
+            heads.extend([start] * len(chain))
+            offsets.extend(np.arange(len(chain)) / len(chain))
+        if len(seen) < len(adjacent):
+            raise ValueError("Bridges cannot form a closed loop")
+        self.chain_members = np.array(members, dtype=np.int64)
+        self.chain_heads = np.array(heads, dtype=np.int64)
+        self.chain_offsets = np.array(offsets, dtype=float)
+
+    def apply(self, cost_matrix):
+        # Soft constraints, in place on a dense matrix: every bridge costs bridge_cost and all
+        # other edges at a bridge city pay penalty_factor times the mean finite edge cost
+        if not isinstance(cost_matrix, np.ndarray):
+            raise TypeError("Bridge penalties need a dense cost matrix; use hard constraints instead")
+        if not len(self):
+            return cost_matrix
+        cost_matrix[self.a, self.b] = cost_matrix[self.b, self.a] = self.bridge_cost
+        self.penalty = cost_matrix.mean(where=np.isfinite(cost_matrix)) * self.penalty_factor
+        ends = np.unique(self.edges)
+        cost_matrix[ends, :] += self.penalty
+        cost_matrix[:, ends] += self.penalty
+        cost_matrix[self.a, self.b] = cost_matrix[self.b, self.a] = self.bridge_cost
+        return cost_matrix
+
+    def uses(self, tours, pos=None):
+        # Whether each tour contains each bridge, shape (..., num_edges); O(1) per edge once
+        # the position index is built
+        if pos is None:
+            pos = tour_positions(tours)
+        n = pos.shape[-1]
+        gap = (pos[..., self.a] - pos[..., self.b]) % n
+        return (gap == 1) | (gap == n - 1)
+
+    def missing(self, tours, pos=None):
+        # Number of bridges each tour leaves out
+        return len(self) - self.uses(tours, pos).sum(axis=-1)
+
+    def repair(self, tours):
+        # Rebuild every broken bridge chain at its head's position, in place on an int array of
+        # one or many tours. Returns a boolean mask of the tours that changed.
+        rows = tours.reshape(-1, tours.shape[-1])
+        if not len(self):
+            return np.zeros(len(rows), dtype=bool)
+        pos = tour_positions(rows)
+        broken = self.missing(rows, pos) > 0
+        if broken.any():
+            keys = pos[broken].astype(float)
+            keys[:, self.chain_members] = keys[:, self.chain_heads] + self.chain_offsets
+            rows[broken] = np.argsort(keys, axis=1, kind='stable')
+        return broken
+
+    def penalties(self, tours, pos=None):
+        # Extra cost for tours that miss bridges (used where the matrix carries no penalty)
+        return self.missing(tours, pos) * self.missing_penalty
+
+
+def pairwise_distances(points_a, points_b):
+    # Euclidean distances between two coordinate blocks by broadcasting
+    diff = points_a[:, None, :] - points_b[None, :, :]
+    return np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+
+
+def tsplib_round(distances, edge_weight_type):
+    # TSPLIB's integer distance functions on top of Euclidean distances; None keeps them exact
+    if edge_weight_type == "ATT":
+        distances = distances / np.sqrt(10.0)
+        rounded = np.floor(distances + 0.5)
+        return rounded + (rounded < distances)  # pseudo-Euclidean: always round up
+    if edge_weight_type == "CEIL_2D":
+        return np.ceil(distances)
+    if edge_weight_type == "EUC_2D":
+        return np.floor(distances + 0.5)
+    return distances
+
+
+class CondensedCostMatrix:
+    """Symmetric cost matrix stored as its upper triangle in one flat array.
+
+    Indexes like the dense matrix: ``m[i, j]`` with scalars or broadcastable index arrays,
+    ``m[i]`` or ``m[rows]`` for full rows. The diagonal reads as inf.
+    """
+
+    def __init__(self, values, num):
+        self.values = values
+        self.num = num
+        self.shape = (num, num)
+        self.dtype = values.dtype
+
+    def __len__(self):
+        return self.num
+
+    def _offsets(self, i, j):
+        low, high = np.minimum(i, j), np.maximum(i, j)
+        return low * self.num - low * (low + 1) // 2 + (high - low - 1)
+
+    def row(self, i):
+        row = np.empty(self.num, dtype=self.values.dtype)
+        before = np.arange(i)
+        row[:i] = self.values[self._offsets(before, i)]
+        row[i] = np.inf
+        start = self._offsets(i, i + 1) if i + 1 < self.num else 0
+        row[i + 1:] = self.values[start:start + self.num - i - 1]
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = np.broadcast_arrays(np.asarray(key[0], dtype=np.int64), np.asarray(key[1], dtype=np.int64))
+            same = i == j
+            if not len(self.values):
+                values = np.full(i.shape, np.inf)
             else:
-                matrix[i][j] = np.linalg.norm(np.array(cities[i]) - np.array(cities[j]))
-    return matrix
+                values = np.where(same, np.inf, self.values[np.where(same, 0, self._offsets(i, j))])
+            return values[()] if values.ndim == 0 else values
+        if np.ndim(key) == 0:
+            return self.row(int(key))
+        return np.stack([self.row(int(i)) for i in np.asarray(key).ravel()]).reshape(np.shape(key) + (self.num,))
+
+    def to_dense(self):
+        return np.stack([self.row(i) for i in range(self.num)])
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype)
+
+
+class DistanceOracle:
+    """Euclidean distances computed from coordinates on demand, for instances too large for a matrix.
+
+    Indexes like the dense matrix. ``m[i, j]`` with index arrays (for example a whole batch of
+    tours) is computed straight from the coordinates. Full rows ``m[i]`` are kept in an LRU
+    cache capped at ``cache_bytes``. ``edge_weight_type`` ("EUC_2D", "CEIL_2D" or "ATT") applies
+    TSPLIB's rounding, so the costs match the instance's dense matrix.
+    """
+
+    def __init__(self, cities, cache_bytes=256 * 2 ** 20, dtype=np.float32, edge_weight_type=None):
+        self.cities = np.asarray(cities, dtype=float)
+        self.num = len(self.cities)
+        self.shape = (self.num, self.num)
+        self.dtype = np.dtype(dtype)
+        self.edge_weight_type = edge_weight_type
+        self.max_rows = max(1, int(cache_bytes // max(1, self.num * self.dtype.itemsize)))
+        self._rows = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.num
+
+    def row(self, i):
+        row = self._rows.get(i)
+        if row is not None:
+            self._rows.move_to_end(i)
+            self.hits += 1
+            return row
+        self.misses += 1
+        row = tsplib_round(pairwise_distances(self.cities[i:i + 1], self.cities)[0], self.edge_weight_type)
+        row = row.astype(self.dtype)
+        row[i] = np.inf
+        row.flags.writeable = False  # rows are shared with every caller
+        self._rows[i] = row
+        if len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = np.asarray(key[0]), np.asarray(key[1])
+            diff = self.cities[i] - self.cities[j]
+            values = tsplib_round(np.sqrt((diff * diff).sum(axis=-1)), self.edge_weight_type).astype(self.dtype)
+            values = np.where(i == j, np.inf, values)
+            return values[()] if values.ndim == 0 else values
+        if np.ndim(key) == 0:
+            return self.row(int(key))
+        return np.stack([self.row(int(i)) for i in np.asarray(key).ravel()]).reshape(np.shape(key) + (self.num,))
+
+    def __array__(self, dtype=None, copy=None):
+        dense = create_cost_matrix(self.cities, dtype=self.dtype)
+        if self.edge_weight_type is not None:
+            dense = tsplib_round(dense, self.edge_weight_type).astype(self.dtype)
+        return dense if dtype is None else dense.astype(dtype)
+
+
+def create_cost_matrix(cities, condensed=False, dtype=np.float64, block_size=1024):
+    # Vectorized Euclidean cost matrix, built in row blocks to bound temporary memory.
+    # condensed=True stores only the upper triangle (float32 by default) behind a
+    # CondensedCostMatrix, which every solver can index like the dense matrix.
+    cities = np.asarray(cities, dtype=float)
+    num = len(cities)
+
+    if not condensed:
+        matrix = np.empty((num, num), dtype=dtype)
+        for start in range(0, num, block_size):
+            stop = min(start + block_size, num)
+            matrix[start:stop] = pairwise_distances(cities[start:stop], cities)
+        np.fill_diagonal(matrix, np.inf)
+        return matrix
+
+    if dtype is np.float64:
+        dtype = np.float32
+    values = np.empty(num * (num - 1) // 2, dtype=dtype)
+    offset = 0
+    for start in range(0, num, block_size):
+        stop = min(start + block_size, num)
+        block = pairwise_distances(cities[start:stop], cities[start:])
+        for row in range(stop - start):
+            upper = block[row, row + 1:]
+            values[offset:offset + len(upper)] = upper
+            offset += len(upper)
+    return CondensedCostMatrix(values, num)
+
+
+def tour_lengths(tours, cost_matrix):
+    # Total closed-tour cost for one tour or a (num_tours, n) array of tours in a single gather
+    tours = np.asarray(tours)
+    return cost_matrix[tours, np.roll(tours, -1, axis=-1)].sum(axis=-1)
 
 
+def nearest_neighbour_lists(cost_matrix, k, block_size=1024):
+    # k nearest neighbours of every city, sorted by distance, as an (n, k) int32 array
+    if getattr(cost_matrix, "cities", None) is not None:
+        # A distance oracle has coordinates: search a grid instead of scanning all n rows.
+        # TSPLIB rounding is monotone, so the Euclidean order still holds.
+        from Bio.src.instance import GridIndex
+        return GridIndex(cost_matrix.cities).knn(k)[0]
+    num = len(cost_matrix)
+    k = min(k, num - 1)
+    neighbours = np.empty((num, k), dtype=np.int32)
+    for start in range(0, num, block_size):
+        rows = np.arange(start, min(start + block_size, num))
+        block = np.array(cost_matrix[rows], dtype=float)
+        block[np.arange(len(rows)), rows] = np.inf  # never list a city as its own neighbour
+        nearest = np.argpartition(block, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(block, nearest, axis=1), axis=1)
+        neighbours[rows] = np.take_along_axis(nearest, order, axis=1)
+    return neighbours
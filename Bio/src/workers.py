@@ -1,21 +1,63 @@
-from PyQt5.QtCore import QThread, pyqtSignal
+import time
+import traceback
+
 import numpy as np
-from algorithms.GA import run_tsp_ga  # Import GA function
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from algorithms.termination import TerminationPolicy
+
+
+class WorkerSignals(QObject):
+    """Signals of a SolverWorker; QRunnable itself cannot emit."""
+    progress = pyqtSignal(int, float, object)  # iteration, best cost, best tour
+    finished = pyqtSignal(object)  # the solver's return value
+    error = pyqtSignal(str)  # formatted traceback
+    snapshot = pyqtSignal(str, object)  # solver name, Snapshot (race mode)
+
+
+class SolverWorker(QRunnable):
+    """Runs any solver on a QThreadPool thread so the window stays responsive.
 
-class GAWorker(QThread):
-    """Runs the Genetic Algorithm (GA) in a separate thread."""
-    finished = pyqtSignal(np.ndarray, list, float)  # Signal to send results back
+    The solver is called as solver(*args, **kwargs, termination=..., progress=...). Progress
+    is throttled to one signal per progress_interval seconds, and cancel() stops the solver
+    cooperatively through its TerminationPolicy at the end of the current iteration.
+    """
 
-    def __init__(self, num_cities, population_size, generations, mutation_rate):
+    def __init__(self, solver, *args, termination=None, progress_interval=0.1, **kwargs):
         super().__init__()
-        self.num_cities = num_cities
-        self.population_size = population_size
-        self.generations = generations
-        self.mutation_rate = mutation_rate
+        self.solver = solver
+        self.args = args
+        self.kwargs = kwargs
+        self.termination = termination if termination is not None else TerminationPolicy()
+        self.progress_interval = progress_interval
+        self.last_progress = 0.0
+        self.signals = WorkerSignals()
+
+    def cancel(self):
+        self.termination.cancel()
+
+    def report(self, iteration, best_cost, best_tour):
+        now = time.perf_counter()
+        if now - self.last_progress < self.progress_interval or best_tour is None:
+            return
+        self.last_progress = now
+        # Copy: solvers keep updating their arrays in place after the signal is queued
+        self.signals.progress.emit(int(iteration), float(best_cost), np.array(best_tour))
 
     def run(self):
-        """Runs the GA and emits the result when finished."""
-        cities, best_tour, best_distance = run_tsp_ga(
-            self.num_cities, self.population_size, self.generations, self.mutation_rate
-        )
-        self.finished.emit(cities, best_tour, best_distance)  # Send results back
+        try:
+            result = self.solver(*self.args, **self.kwargs, termination=self.termination, progress=self.report)
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+        else:
+            self.signals.finished.emit(result)
+
+
+class RaceWorker(SolverWorker):
+    """SolverWorker for run_race: progress arrives per solver as (name, Snapshot).
+
+    The race's worker processes already throttle their snapshots, so every one is forwarded.
+    """
+
+    def report(self, name, snapshot):
+        self.signals.snapshot.emit(name, snapshot)
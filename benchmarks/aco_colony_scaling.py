@@ -0,0 +1,64 @@
+# Wall-clock scaling of multi_colony_aco with the number of colonies.
+#
+# Every colony does the same amount of work, so with perfect scaling the wall time stays flat
+# and colony-iterations per second grow linearly with the number of colonies.
+#
+#   python -m benchmarks.aco_colony_scaling --nodes 300 --iterations 20 --max-colonies 32
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+
+from Bio.src.algorithms.ACO import multi_colony_aco
+from Bio.src.plotting.utils import create_cost_matrix
+
+
+def colony_counts(max_colonies):
+    counts = [1]
+    while counts[-1] * 2 <= max_colonies:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_colonies:
+        counts.append(max_colonies)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-colony ACO scaling benchmark")
+    parser.add_argument("--nodes", type=int, default=300)
+    parser.add_argument("--ants", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--exchange-interval", type=int, default=5)
+    parser.add_argument("--candidate-k", type=int, default=15)
+    parser.add_argument("--max-colonies", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    cities = np.random.rand(args.nodes, 2) * 100
+    cost_matrix = create_cost_matrix(cities)
+
+    # Warm-up so the first row does not pay for imports and page faults
+    with contextlib.redirect_stdout(io.StringIO()):
+        multi_colony_aco(cost_matrix, 1.0, 2.0, 1.0, 0.1, 2, 100.0, 1, colonies=1, candidate_k=args.candidate_k)
+
+    print(f"{'colonies':>8} {'wall s':>9} {'colony-it/s':>12} {'speedup':>8} {'efficiency':>10} {'best':>10}")
+    base_rate = None
+    for colonies in colony_counts(args.max_colonies):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, best_cost = multi_colony_aco(
+                cost_matrix, 1.0, 2.0, 1.0, 0.1, args.ants, 100.0, args.iterations, colonies=colonies,
+                exchange_interval=args.exchange_interval, candidate_k=args.candidate_k, processes=colonies
+            )
+        elapsed = time.perf_counter() - start
+        rate = colonies * args.iterations / elapsed
+        base_rate = base_rate or rate
+        speedup = rate / base_rate
+        print(f"{colonies:>8} {elapsed:>9.2f} {rate:>12.1f} {speedup:>8.2f} {speedup / colonies:>10.0%} {best_cost:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# Scaling and memory regression suite for the main entry points.
+#
+# Every (entry point, n) pair is measured in a fresh subprocess, so peak RSS belongs to that
+# measurement alone: one pass under tracemalloc for the peak of Python/numpy allocations, then
+# one untraced pass for the time (per iteration for the solvers, from the gaps between their
+# progress callbacks). The exponent k of time ~ n^k and memory ~ n^k is fitted on a
+# log-log scale over the sizes from --fit-from up. The run fails (exit status 1) when an
+# exponent or a peak exceeds its limit in the thresholds file; each entry's max_n there keeps
+# the dense O(n^2) entry points off sizes that do not fit in memory.
+#
+# Exponent limits only hold for the sizes they were calibrated on (the file's fit_sizes, which
+# the default sweep produces): fits over other sizes include different fixed overheads and the
+# switch to a distance oracle above DENSE_MATRIX_LIMIT, so they are reported but not checked.
+# Peak limits apply to every size.
+#
+#   python -m benchmarks.scaling_suite --sizes 10,100,1000,10000 --output scaling.json
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS from getrusage
+    resource = None
+
+from Bio.src.algorithms.ACO import ant_colony_optimization
+from Bio.src.algorithms.GA import run_tsp_ga
+from Bio.src.algorithms.GBC import dabc_fns
+from Bio.src.algorithms.PSO import run_tsp_pso
+from Bio.src.instance import DENSE_MATRIX_LIMIT, TSPInstance
+from Bio.src.plotting.utils import apply_mandatory_bridge, create_cost_matrix, DistanceOracle
+
+THRESHOLDS = os.path.join(os.path.dirname(__file__), "scaling_thresholds.json")
+ORACLE_CACHE_BYTES = 2 ** 20
+
+
+def cost_matrix_for(cities):
+    # What the app uses: a dense matrix up to DENSE_MATRIX_LIMIT, distances on demand above it.
+    # The oracle's row cache is kept small, so the memory fit measures the solver, not the cache.
+    if len(cities) <= DENSE_MATRIX_LIMIT:
+        return create_cost_matrix(cities)
+    return DistanceOracle(cities, cache_bytes=ORACLE_CACHE_BYTES)
+
+
+def aco_inputs(cities):
+    # Candidate lists and nearest-unvisited queries from the instance's grid, as the app passes
+    # them, so the entry measures the colony rather than a k-NN build
+    instance = TSPInstance(cities, cost_matrix_for(cities))
+    return instance.cost_matrix, instance.neighbour_lists(20), instance.nearest_unvisited
+
+
+# Entry points: name -> (setup(cities) -> inputs, run(inputs, progress)). Solvers run a few
+# iterations and report each through progress; the others are timed as one call.
+ENTRIES = {
+    "create_cost_matrix": (
+        lambda cities: cities,
+        lambda cities, progress: create_cost_matrix(cities),
+    ),
+    "apply_mandatory_bridge": (
+        create_cost_matrix,
+        lambda cost_matrix, progress: apply_mandatory_bridge(cost_matrix, 0, 1),
+    ),
+    "ant_colony_optimization": (
+        aco_inputs,
+        lambda inputs, progress: ant_colony_optimization(
+            inputs[0], 1.0, 2.0, 1.0, 0.1, 10, 100.0, 6, candidate_k=20, neighbours=inputs[1],
+            nearest_unvisited=inputs[2], progress=progress),
+    ),
+    "run_tsp_ga": (
+        lambda cities: (cities, cost_matrix_for(cities)),
+        lambda inputs, progress: run_tsp_ga(
+            len(inputs[0]), 20, 6, 0.1, cities=inputs[0], cost_matrix=inputs[1], progress=progress),
+    ),
+    "run_tsp_pso": (
+        lambda cities: (cities, cost_matrix_for(cities)),
+        lambda inputs, progress: run_tsp_pso(
+            len(inputs[0]), 20, 0.5, 1.5, 1.5, 5, 6, cities=inputs[0], cost_matrix=inputs[1], progress=progress),
+    ),
+    "dabc_fns": (
+        cost_matrix_for,
+        lambda cost_matrix, progress: dabc_fns(cost_matrix, sn=10, max_cycle=20, progress=progress),
+    ),
+}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # bytes on macOS, KiB elsewhere
+
+
+def measure(entry, n, seed=0):
+    # Runs inside the subprocess: traced memory, then time, of one entry point at one size
+    np.random.seed(seed)
+    setup, run = ENTRIES[entry]
+    inputs = setup(np.random.rand(n, 2) * 100)
+    rss_before = peak_rss_mb()
+
+    # The traced pass goes first and doubles as the warm-up (lazy imports, first-call setup)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(inputs, lambda *snapshot: None)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stamps = []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(inputs, lambda *snapshot: stamps.append(time.perf_counter()))
+    total = time.perf_counter() - started
+    # Solvers: median gap between iterations; single calls: the call itself
+    per_iteration = float(np.median(np.diff(stamps))) if len(stamps) > 2 else total
+    return {"entry": entry, "n": n, "seconds": per_iteration, "total_seconds": total,
+            "traced_peak_mb": traced_peak / 2 ** 20, "rss_peak_mb": peak_rss_mb(), "rss_before_mb": rss_before}
+
+
+def measure_in_subprocess(entry, n, timeout):
+    command = [sys.executable, "-m", "benchmarks.scaling_suite", "--measure", entry, str(n)]
+    try:
+        done = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"entry": entry, "n": n, "error": f"timed out after {timeout:g}s"}
+    if done.returncode != 0:
+        return {"entry": entry, "n": n, "error": done.stderr.strip().splitlines()[-1] if done.stderr else "failed"}
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def fit_exponent(sizes, values):
+    # Slope of log(value) against log(n); None with fewer than two usable points
+    points = [(n, v) for n, v in zip(sizes, values) if v and v > 0]
+    if len(points) < 2:
+        return None
+    log_n, log_v = np.log([p[0] for p in points]), np.log([p[1] for p in points])
+    return float(np.polyfit(log_n, log_v, 1)[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling and memory regression suite")
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--entries", help="comma-separated subset of " + ",".join(ENTRIES))
+    parser.add_argument("--fit-from", type=int, default=100,
+                        help="smallest n in the fits; tiny sizes only measure fixed overhead")
+    parser.add_argument("--thresholds", default=THRESHOLDS)
+    parser.add_argument("--timeout", type=float, default=600.0, help="seconds per measurement")
+    parser.add_argument("--output", help="write all measurements and fits to this JSON file")
+    parser.add_argument("--measure", nargs=2, metavar=("ENTRY", "N"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure[0], int(args.measure[1]))))
+        return
+
+    with open(args.thresholds) as handle:
+        thresholds = json.load(handle)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    entries = args.entries.split(",") if args.entries else list(ENTRIES)
+    failures, report = [], {}
+
+    for entry in entries:
+        limits = thresholds["limits"].get(entry, {})
+        results = []
+        for n in sizes:
+            if n > limits.get("max_n", float("inf")):
+                continue
+            result = measure_in_subprocess(entry, n, args.timeout)
+            results.append(result)
+            if "error" in result:
+                print(f"{entry:>24} n={n:<6} ERROR {result['error']}")
+                failures.append(f"{entry} n={n}: {result['error']}")
+                continue
+            rss = "-" if result["rss_peak_mb"] is None else f"{result['rss_peak_mb']:.0f}"
+            print(f"{entry:>24} n={n:<6} {result['seconds'] * 1000:10.2f} ms/it  "
+                  f"traced peak {result['traced_peak_mb']:9.1f} MB  RSS peak {rss} MB")
+            peak_limit = limits.get("peak_memory_mb")
+            if peak_limit is not None and result["traced_peak_mb"] > peak_limit:
+                failures.append(f"{entry} n={n}: traced peak {result['traced_peak_mb']:.1f} MB > {peak_limit} MB")
+
+        fitted = [r for r in results if "error" not in r and r["n"] >= args.fit_from]
+        fit_sizes = [r["n"] for r in fitted]
+        exponents = {"time_exponent": fit_exponent(fit_sizes, [r["seconds"] for r in fitted]),
+                     "memory_exponent": fit_exponent(fit_sizes, [r["traced_peak_mb"] for r in fitted])}
+        calibrated = fit_sizes == thresholds["fit_sizes"]
+        for name, value in exponents.items():
+            limit = limits.get(name)
+            verdict = ""
+            if value is not None and limit is not None and not calibrated:
+                verdict = f"  (not checked: limit {limit} is for n = {thresholds['fit_sizes']})"
+            elif value is not None and limit is not None and value > limit:
+                verdict = f" > limit {limit}  FAIL"
+                failures.append(f"{entry}: {name} {value:.2f} > {limit}")
+            print(f"{entry:>24} {name} {'-' if value is None else f'{value:.2f}'}{verdict}")
+        report[entry] = {"measurements": results, **exponents}
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"sizes": sizes, "thresholds": thresholds, "results": report}, handle, indent=2)
+    if failures:
+        print(f"\n{len(failures)} failure(s):\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nAll within thresholds.")
+
+
+if __name__ == "__main__":
+    main()
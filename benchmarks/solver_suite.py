@@ -0,0 +1,184 @@
+# Time-to-target benchmark of all four solvers on the bundled instances.
+#
+# Every solver runs with fixed parameters and fixed seeds on the lattice instances in
+# benchmarks/instances (optimal tour = cities * spacing, listed in best_known.json) and records
+# wall time, evaluations per second, the time to come within each target gap of the optimum
+# and the final gap. `run` writes them to JSON; `compare` flags regressions against a stored
+# run, e.g. one made on the main branch:
+#
+#   python -m benchmarks.solver_suite run --output baseline.json
+#   python -m benchmarks.solver_suite run --output current.json
+#   python -m benchmarks.solver_suite compare current.json baseline.json
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from Bio.src.algorithms.base import SOLVER_MODULES, run_snapshots
+from Bio.src.algorithms.termination import TerminationPolicy
+from Bio.src.instance import build_instance
+
+INSTANCE_DIR = os.path.join(os.path.dirname(__file__), "instances")
+
+# Fixed iteration budgets, so wall time measures speed and the gap measures quality
+SUITE_PARAMS = {
+    "ACO": dict(alpha=1.0, beta=3.0, initial_pheromone=1.0, evap_rate=0.1, m=20, constant=100.0, I_max=100,
+                candidate_k=10),
+    "PSO": dict(num_particles=50, w=0.5, c1=1.5, c2=1.5, v_max=5, max_iterations=300),
+    "GA": dict(population_size=100, generations=200, mutation_rate=0.1, local_search="2-opt",
+               local_search_share=0.2),
+    "GBC": dict(sn=20, max_cycle=2000, trial_limit=100),
+}
+TARGET_GAPS = (0.10, 0.05, 0.01)
+
+
+def run_case(instance, solver, seed, best_known, time_limit):
+    # One seeded run; returns its metrics
+    np.random.seed(seed)
+    random.seed(seed)
+    reached = {}
+
+    def record(iteration, best_cost, best_tour):
+        gap = best_cost / best_known - 1
+        for target in TARGET_GAPS:
+            if gap <= target + 1e-9 and target not in reached:
+                reached[target] = time.perf_counter() - started
+
+    iter_solve = importlib.import_module(SOLVER_MODULES[solver]).iter_solve
+    termination = TerminationPolicy(max_seconds=time_limit)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # ACO reports every iteration
+        last = run_snapshots(iter_solve(instance, SUITE_PARAMS[solver]), termination, record)
+    wall = time.perf_counter() - started
+    return {
+        "wall_time": wall,
+        "evaluations": int(last.evaluations),
+        "evals_per_sec": last.evaluations / wall,
+        "best_cost": float(last.best_cost),
+        "gap": float(last.best_cost / best_known - 1),
+        "time_to_target": {f"{target:.0%}": reached.get(target) for target in TARGET_GAPS},
+        "stop_reason": termination.reason,
+    }
+
+
+def summarise(runs):
+    # Medians over the seeds; a target counts as reached only if every seed reached it
+    summary = {}
+    for metric in ("wall_time", "evals_per_sec", "gap"):
+        summary[metric] = float(np.median([run[metric] for run in runs]))
+    summary["time_to_target"] = {}
+    for target in runs[0]["time_to_target"]:
+        times = [run["time_to_target"][target] for run in runs]
+        summary["time_to_target"][target] = None if None in times else float(np.median(times))
+    return summary
+
+
+def run_suite(args):
+    with open(os.path.join(INSTANCE_DIR, "best_known.json")) as handle:
+        best_known = json.load(handle)
+    solvers = args.solvers.split(",") if args.solvers else list(SUITE_PARAMS)
+    results = {}
+    for file_name, optimum in best_known.items():
+        instance = build_instance(os.path.join(INSTANCE_DIR, file_name))
+        for solver in solvers:
+            runs = [run_case(instance, solver, seed, optimum, args.time_limit) for seed in range(args.repeats)]
+            summary = summarise(runs)
+            results[f"{instance.name}/{solver}"] = {"runs": runs, "summary": summary}
+            reached = summary["time_to_target"][f"{TARGET_GAPS[-1]:.0%}"]
+            print(f"{instance.name:>8} {solver:>4} wall {summary['wall_time']:7.2f}s "
+                  f"{summary['evals_per_sec']:10.0f} evals/s  gap {summary['gap']:7.2%}  "
+                  f"to {TARGET_GAPS[-1]:.0%}: {'-' if reached is None else f'{reached:.2f}s'}")
+
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                 "processor": platform.processor(), "cpus": os.cpu_count(), "repeats": args.repeats,
+                 "time_limit": args.time_limit, "params": SUITE_PARAMS,
+                 "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Wrote {args.output}")
+
+
+def compare(args):
+    # Regressions: slower (wall time, time to target) or fewer evaluations per second by more
+    # than --tolerance, a worse final gap by more than --gap-tolerance, or a target no longer reached
+    with open(args.current) as handle:
+        current = json.load(handle)["results"]
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)["results"]
+
+    regressions = []
+    for key in sorted(set(current) & set(baseline)):
+        now, then = current[key]["summary"], baseline[key]["summary"]
+        tolerance = 1 + args.tolerance
+        # Short runs jitter by more than the tolerance, so timings also need to move by min_seconds
+        slower = now["wall_time"] > then["wall_time"] * tolerance + args.min_seconds
+        throughput_loss = (now["evals_per_sec"] < then["evals_per_sec"] / tolerance
+                           and now["wall_time"] > then["wall_time"] + args.min_seconds)
+        checks = [("wall_time", then["wall_time"], now["wall_time"], slower),
+                  ("evals_per_sec", then["evals_per_sec"], now["evals_per_sec"], throughput_loss),
+                  ("gap", then["gap"], now["gap"], now["gap"] > then["gap"] + args.gap_tolerance)]
+        for target, before in then["time_to_target"].items():
+            after = now["time_to_target"].get(target)
+            slower = before is not None and (after is None or after > before * tolerance + args.min_seconds)
+            checks.append((f"time_to_{target}", before, after, slower))
+
+        changes = []
+        for metric, before, after, regressed in checks:
+            changes.append(f"{metric} {format_value(before)} -> {format_value(after)}"
+                           + (" REGRESSION" if regressed else ""))
+            if regressed:
+                regressions.append(f"{key}: {metric}")
+        print(f"{key}: " + ", ".join(changes))
+
+    for key in sorted(set(baseline) - set(current)):
+        print(f"{key}: missing from {args.current}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+def format_value(value):
+    return "-" if value is None else f"{value:.4g}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solver time-to-target benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write a JSON report")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--repeats", type=int, default=3, help="seeds 0..repeats-1 per case")
+    run_parser.add_argument("--solvers", help="comma-separated subset of " + ",".join(SUITE_PARAMS))
+    run_parser.add_argument("--time-limit", type=float, default=60.0, help="safety limit per run (s)")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline report")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--tolerance", type=float, default=0.25,
+                                help="allowed relative slow-down before a timing counts as a regression")
+    compare_parser.add_argument("--gap-tolerance", type=float, default=0.02,
+                                help="allowed absolute increase of the final gap")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.1,
+                                help="timing noise floor: smaller slow-downs never count as regressions")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run_suite(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
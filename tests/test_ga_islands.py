@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from Bio.src.algorithms.GA import migration_sources, run_tsp_ga_islands
+
+
+@pytest.mark.parametrize("topology", ["ring", "star", "full"])
+def test_single_island_runs_without_migration(topology):
+    assert migration_sources(topology, 1) == [[]]
+    np.random.seed(0)
+    cities, tour, distance, history = run_tsp_ga_islands(12, 10, 6, 0.1, islands=1, migration_interval=2,
+                                                         topology=topology)
+    assert sorted(tour) == list(range(12))
+    assert len(history) == 7  # initial population plus every generation
+    assert distance == pytest.approx(min(history))
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from Bio.src.instance import build_instance, load_instance
+
+CITIES = [(6734, 1453), (2233, 10), (5530, 1424), (401, 841), (3082, 1644), (7608, 4458), (7573, 3716)]
+
+
+def write_tsplib(path, edge_weight_type):
+    lines = [f"NAME: {path.stem}", "TYPE: TSP", f"DIMENSION: {len(CITIES)}", f"EDGE_WEIGHT_TYPE: {edge_weight_type}",
+             "NODE_COORD_SECTION"]
+    lines += [f"{i} {x} {y / 7.3}" for i, (x, y) in enumerate(CITIES, 1)]  # fractional y for CEIL_2D
+    path.write_text("\n".join(lines + ["EOF"]) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("edge_weight_type", ["ATT", "CEIL_2D", "EUC_2D"])
+def test_oracle_matches_dense_costs(tmp_path, edge_weight_type):
+    # Above dense_limit the instance switches to a DistanceOracle; its costs must not change scale
+    path = write_tsplib(tmp_path / "small.tsp", edge_weight_type)
+    dense = build_instance(path).cost_matrix
+    oracles = [build_instance(path, dense_limit=3).cost_matrix,
+               load_instance(path, cache_dir=str(tmp_path / "cache"), dense_limit=3).cost_matrix,
+               load_instance(path, cache_dir=str(tmp_path / "cache"), dense_limit=3).cost_matrix]  # cached
+    assert isinstance(dense, np.ndarray)
+    rows, cols = np.triu_indices(len(CITIES), 1)
+    for oracle in oracles:
+        assert not isinstance(oracle, np.ndarray)
+        np.testing.assert_allclose(oracle[rows, cols], dense[rows, cols])
+        np.testing.assert_allclose(np.stack([oracle[i] for i in range(len(CITIES))]), dense)
+        np.testing.assert_allclose(np.asarray(oracle), dense)